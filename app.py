@@ -1,11 +1,23 @@
 import streamlit as st
-import PyPDF2
 import pandas as pd
 from groq import Groq
 import json
 import io
-import re
 from datetime import datetime
+from data_evaluator import DataEvaluator
+from tiered_extraction import TieredExtractor, LARGE_MODEL, DEFAULT_THRESHOLD, DEFAULT_TIERS
+from job_queue import JobQueue, PARSING, LLM, WRITING, build_zip, build_workbook
+from result_store import ResultStore, content_hash
+from ocr import OCRFallback, OCR_AVAILABLE, is_blank
+from singleflight import SingleFlight
+from structured_output import StructuredOutputClient, JSON_OBJECT_INSTRUCTION
+from client_pool import ClientPool, DEFAULT_MAX_IN_FLIGHT
+from dry_run import estimate_document, project, format_duration, MAX_OUTPUT_TOKENS, TOKENIZER
+from row_index import RowIndex
+from prefetch import ParsePrefetcher, prepare_document
+from table_extraction import TABLES_AVAILABLE, table_sheet_names, write_tables
+from rows import to_rows, rows_to_frame
+import uuid
 
 # Page configuration
 st.set_page_config(
@@ -53,21 +65,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-class PDFToExcelConverter:
-    def __init__(self, api_key):
-        self.client = Groq(api_key=api_key)
-        
-    def extract_text_from_pdf(self, pdf_file):
-        """Extract text from uploaded PDF"""
-        text = ""
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        return text
-    
-    def extract_structured_data(self, pdf_text):
-        """Use Groq AI to extract structured data"""
-        prompt = f"""You are an expert data extraction system. Extract ALL information from the following text and structure it into key-value pairs with optional comments.
+EXTRACTION_PROMPT = """You are an expert data extraction system. Extract ALL information from the following text and structure it into key-value pairs with optional comments.
 
 CRITICAL REQUIREMENTS:
 1. Extract 100% of the content - nothing should be missed
@@ -90,8 +88,33 @@ TEXT TO EXTRACT:
 
 Return ONLY the JSON array, no additional text."""
 
+
+def build_prompt(pdf_text):
+    """The exact extraction prompt sent for a piece of document text"""
+    return EXTRACTION_PROMPT.format(pdf_text=pdf_text)
+
+
+class PDFToExcelConverter:
+    def __init__(self, api_key, json_mode=None, client=None):
+        """AI stage only - PDFs are parsed by prefetch.prepare_document"""
+        self.client = client or Groq(api_key=api_key)
+        self.structured_output = None
+        if json_mode:
+            self.structured_output = StructuredOutputClient(self.client, mode=json_mode)
+        
+    def extract_structured_data(self, pdf_text, model=LARGE_MODEL):
+        """Use Groq AI to extract structured data"""
+        if is_blank(pdf_text):
+            raise ValueError("No readable text found - this PDF looks scanned. "
+                             "Enable OCR in the sidebar to convert it.")
+        
+        prompt = build_prompt(pdf_text)
+
+        if self.structured_output:
+            return self.structured_output.extract_rows(model, prompt, pdf_text)
+
         response = self.client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+            model=model,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.1,
             max_tokens=8000
@@ -105,7 +128,7 @@ Return ONLY the JSON array, no additional text."""
         elif "```" in response_text:
             response_text = response_text.split("```")[1].split("```")[0].strip()
         
-        return json.loads(response_text)
+        return to_rows(json.loads(response_text))
 
 #     def extract_structured_data(self, pdf_text):
 #         """Use Groq AI to extract structured data"""
@@ -164,69 +187,425 @@ Return ONLY the JSON array, no additional text."""
 #                 raise Exception(f"🔴 AI Processing Error: {error_msg}")
     
     def create_excel(self, structured_data):
-        """Create Excel file from structured data"""
-        df = pd.DataFrame(structured_data)
-        df.insert(0, '#', range(1, len(df) + 1))
-        df.columns = ['#', 'Key', 'Value', 'Comments']
-        return df
+        """Output frame from the extracted rows"""
+        return rows_to_frame(structured_data)
 
 
-class DataEvaluator:
-    def __init__(self, df, pdf_text):
-        self.df = df
-        self.pdf_text = pdf_text
-        
-    def evaluate_completeness(self):
-        """Calculate completeness percentage"""
-        output_text = ""
-        for _, row in self.df.iterrows():
-            output_text += str(row['Value']) + " " + str(row['Comments']) + " "
-        
-        # Check numbers
-        pdf_numbers = re.findall(r'\b\d+[\d\.,]*\b', self.pdf_text)
-        numbers_found = sum(1 for n in pdf_numbers if n in output_text)
-        number_score = (numbers_found / len(pdf_numbers) * 100) if pdf_numbers else 100
-        
-        # Check important words
-        pdf_words = re.findall(r'\b[A-Z][a-z]+\b', self.pdf_text)
-        words_found = sum(1 for w in pdf_words if w in output_text)
-        word_score = (words_found / len(pdf_words) * 100) if pdf_words else 100
-        
-        return (number_score + word_score) / 2
+def extract_with_options(converter, pdf_text, tiered, tier_threshold, chunks=None):
+    """Run the AI stage, through the tiered extractor when enabled"""
+    if tiered:
+        tiers = TieredExtractor(converter.extract_structured_data, threshold=tier_threshold)
+        return tiers.extract(pdf_text, chunks), tiers.report()
+    return converter.extract_structured_data(pdf_text), None
+
+
+def extraction_options(json_mode, tiered, tier_threshold):
+    """Settings that change the rows the AI returns for a given text"""
+    return (json_mode, bool(tiered), tier_threshold if tiered else None)
+
+
+def extract_once(inflight, api_key, converter, pdf_text, tiered, tier_threshold, chunks=None):
+    """
+    Coalesce concurrent AI extractions of the same text with the same options
+    into one call. Only callers on the same key (and so the same client pool)
+    share a call, so one user's auth or rate-limit error never reaches another.
+    """
+    json_mode = converter.structured_output.mode if converter.structured_output else None
+    options = extraction_options(json_mode, tiered, tier_threshold)
+    key = (content_hash(api_key.encode('utf-8')), content_hash(pdf_text.encode('utf-8'))) + options
+    return inflight.do(key, extract_with_options, converter, pdf_text, tiered, tier_threshold,
+                       chunks)
+
+
+def to_excel_bytes(df, tables=()):
+    """Serialize a result DataFrame (plus extracted tables) to an in-memory .xlsx"""
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='Output', index=False)
+        write_tables(writer, tables)
+    output.seek(0)
+    return output
+
+
+def evaluate_quality(df, pdf_text):
+    """DataEvaluator metrics for a finished conversion"""
+    evaluator = DataEvaluator(df, pdf_text)
+    return {
+        'score': evaluator.get_overall_score(),
+        'completeness': evaluator.evaluate_completeness(),
+        'structure': evaluator.evaluate_structure(),
+        'key_quality': evaluator.evaluate_keys(),
+    }
+
+
+def load_result(result):
+    """Show a stored conversion as the current result"""
+    st.session_state['df'] = result['df']
+    st.session_state['excel'] = result['excel']
+    st.session_state.update(result['metrics'])
+    st.session_state.pop('tier_report', None)
+    st.session_state.pop('tables', None)
+
+
+@st.cache_resource
+def get_job_queue():
+    """Process-wide job queue that survives reruns"""
+    return JobQueue()
+
+
+@st.cache_resource
+def get_client_pool(api_key):
+    """Client pool over the sidebar key plus GROQ_API_KEYS / LLM_ENDPOINTS"""
+    return ClientPool.from_env(api_key)
+
+
+def session_job_id():
+    """Fair-scheduling id for this browser session's interactive conversions"""
+    return st.session_state.setdefault('session_id', uuid.uuid4().hex)
+
+
+@st.cache_resource
+def get_inflight():
+    """In-flight extractions shared by every session, keyed by API key, text and options"""
+    return SingleFlight()
+
+
+@st.cache_resource
+def get_row_index():
+    """Cross-document row index shared by every session"""
+    return RowIndex()
+
+
+def index_result(index, filename, digest, structured_data):
+    """Add a finished conversion's rows to the row index"""
+    index.add_document(f"{filename} [{digest[:12]}]", structured_data, source_pdf=filename)
+
+
+@st.cache_resource
+def get_ocr():
+    """OCR worker pool shared by every session"""
+    return OCRFallback()
+
+
+@st.cache_resource
+def get_prefetcher():
+    """Background parser shared by every session"""
+    return ParsePrefetcher()
+
+
+def upload_digest(uploaded_file):
+    """Content hash of an upload, computed once per uploaded file"""
+    file_id = getattr(uploaded_file, 'file_id', None)
+    if file_id is None:
+        return content_hash(uploaded_file.getvalue())
+    digests = st.session_state.setdefault('upload_digests', {})
+    if file_id not in digests:
+        digests[file_id] = content_hash(uploaded_file.getvalue())
+    return digests[file_id]
+
+
+def result_key(digest, use_ocr, extract_tables, json_mode, tiered, tier_threshold):
+    """
+    Store key for a conversion: a stored result is only served for the same
+    PDF converted with the same parse and extraction options
+    """
+    options = (bool(use_ocr), bool(extract_tables)) + extraction_options(
+        "json_object" if json_mode else None, tiered, tier_threshold)
+    return f"{digest}-{content_hash(json.dumps(options).encode('utf-8'))[:16]}"
+
+
+def prefetch_upload(uploaded_file, use_ocr, extract_tables):
+    """Start parsing an upload in the background; returns (digest, future)"""
+    digest = upload_digest(uploaded_file)
+    future = get_prefetcher().submit(
+        (digest, bool(use_ocr), bool(extract_tables)), prepare_document,
+        uploaded_file.getvalue(), get_ocr() if use_ocr else None, tables=bool(extract_tables))
+    return digest, future
+
+
+def estimate_prepared(name, prepared, tiered, json_mode):
+    """Dry-run estimate for a parsed upload (None if it has no text)"""
+    if is_blank(prepared.text):
+        return None
+    key = (name, tiered, json_mode)
+    if key not in prepared.estimates:
+        chunks = (prepared.chunks or [prepared.text]) if tiered else [prepared.text]
+        instruction = JSON_OBJECT_INSTRUCTION if json_mode else ""
+        requests = [(build_prompt(chunk) + instruction, chunk) for chunk in chunks]
+        if tiered:
+            requests *= len(DEFAULT_TIERS)
+        prepared.estimates[key] = estimate_document(name, requests)
+    return prepared.estimates[key]
+
+
+@st.cache_resource
+def get_result_store():
+    """Result store shared by every session in this server process"""
+    return ResultStore()
+
+
+def render_recent_conversions():
+    """Re-download any recent conversion from the shared store"""
+    store = get_result_store()
+    recent = store.recent()
+    if not recent:
+        return
     
-    def evaluate_structure(self):
-        """Evaluate structure quality"""
-        score = 100
+    st.markdown("---")
+    with st.expander(f"🕘 Recent Conversions ({len(recent)})"):
+        labels = {
+            entry['hash']: f"{entry['filename']} — "
+                           f"{datetime.fromtimestamp(entry['created']).strftime('%Y-%m-%d %H:%M')} — "
+                           f"score {entry['score']}%"
+            for entry in recent
+        }
+        digest = st.selectbox("Conversion", list(labels), format_func=labels.get)
+        excel = store.get_excel(digest)
+        if excel is not None:
+            st.download_button(
+                label="⬇️ Download",
+                data=excel,
+                file_name=f"{labels[digest].split(' — ')[0].rsplit('.', 1)[0]}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
+
+
+# Live-refresh the progress table where the Streamlit version supports fragments
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+_auto_refresh = _fragment(run_every=2) if _fragment else (lambda fn: fn)
+
+
+def render_job_progress():
+    """Per-file progress table and combined downloads for the batch"""
+    jobs = get_job_queue().get(st.session_state.get('job_ids', []))
+    if not jobs:
+        return
+    if any(job.is_active for job in jobs):
+        # Timer reruns of the fragment skip this function, so the flag tells them apart
+        st.session_state['progress_page_run'] = True
+        live_job_progress()
+        st.session_state['progress_page_run'] = False
+    else:
+        job_progress(jobs)
+
+
+@_auto_refresh
+def live_job_progress():
+    """The progress table, re-rendered every few seconds while jobs are running"""
+    job_progress(get_job_queue().get(st.session_state.get('job_ids', [])), live=True)
+
+
+def batch_downloads(jobs):
+    """(zip, workbook) bytes for a finished batch, built once per batch"""
+    key = tuple(job.id for job in jobs)
+    cached = st.session_state.get('batch_downloads')
+    if cached is None or cached[0] != key:
+        cached = (key, build_zip(jobs).getvalue(), build_workbook(jobs).getvalue())
+        st.session_state['batch_downloads'] = cached
+    return cached[1], cached[2]
+
+
+def job_progress(jobs, live=False):
+    """Progress table, then the downloads once every job has finished"""
+    st.dataframe(
+        pd.DataFrame([job.as_row() for job in jobs]),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Progress": st.column_config.ProgressColumn("Progress", min_value=0, max_value=100)
+        }
+    )
+    
+    active = sum(1 for job in jobs if job.is_active)
+    finished = [job for job in jobs if job.finished_ok]
+    if active:
+        st.info(f"⏳ {active} of {len(jobs)} documents still processing...")
+        if not _fragment:
+            st.button("🔄 Refresh")
+        return
+    if live and not st.session_state.get('progress_page_run'):
+        # All finished: one full rerun renders the downloads statically, which stops the timer
+        st.rerun()
+    
+    if not finished:
+        st.error("❌ All documents failed")
+        return
+    
+    st.success(f"✅ {len(finished)} of {len(jobs)} documents converted")
+    zip_bytes, workbook_bytes = batch_downloads(finished)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            label="⬇️ Download All (ZIP)",
+            data=zip_bytes,
+            file_name=f"structured_outputs_{timestamp}.zip",
+            mime="application/zip",
+            use_container_width=True
+        )
+    with col2:
+        st.download_button(
+            label="⬇️ Download Multi-Sheet Workbook",
+            data=workbook_bytes,
+            file_name=f"structured_outputs_{timestamp}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            use_container_width=True,
+            type="primary"
+        )
+
+
+def render_estimate(estimates, scanned, api_key, tiered):
+    """Pre-flight requests / tokens / time / cost projection for the uploads"""
+    endpoints = len(get_client_pool(api_key).endpoints)
+    totals = project(estimates, endpoints=endpoints, concurrency=DEFAULT_MAX_IN_FLIGHT)
+    
+    with st.expander(f"🧮 Estimate: {totals['requests']} requests, "
+                     f"~{format_duration(totals['seconds'])}, ~${totals['cost']:.4f}"):
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Requests", totals['requests'])
+        col2.metric("Input Tokens", f"{totals['input_tokens']:,}")
+        col3.metric("Output Tokens", f"~{totals['output_tokens']:,}")
+        col4.metric("Duration", f"~{format_duration(totals['seconds'])}")
+        if len(estimates) > 1:
+            st.dataframe(pd.DataFrame(estimates), hide_index=True, use_container_width=True)
+        if totals['over_cap']:
+            st.warning(f"⚠️ Output will likely be cut off at {MAX_OUTPUT_TOKENS} tokens for: "
+                       f"{', '.join(totals['over_cap'])}. Enable tiered extraction (chunks the "
+                       f"document) or schema-validated JSON (repairs truncated output).")
+        if scanned:
+            st.warning("🔍 No text layer (needs OCR): " + ", ".join(scanned))
+        st.caption(f"No API calls made. Tokenizer: {TOKENIZER}; {endpoints} endpoint(s), "
+                   f"limited by {totals['limited_by']}"
+                   + ("; tiered assumes every chunk escalates" if tiered else ""))
+
+
+def render_upload_preview(uploaded_files, api_key, tiered, json_mode, use_ocr, extract_tables):
+    """Parse uploads in the background and show their stats and estimate as they finish"""
+    futures = [(f.name, prefetch_upload(f, use_ocr, extract_tables)[1]) for f in uploaded_files]
+    if all(future.done() for _, future in futures):
+        upload_preview(futures, api_key, tiered, json_mode)
+    else:
+        # Timer reruns of the fragment skip this function, so the flag tells them apart
+        st.session_state['preview_page_run'] = True
+        live_upload_preview(futures, api_key, tiered, json_mode)
+        st.session_state['preview_page_run'] = False
+
+
+@_auto_refresh
+def live_upload_preview(futures, api_key, tiered, json_mode):
+    """The preview, re-rendered every few seconds while parses are still running"""
+    upload_preview(futures, api_key, tiered, json_mode, live=True)
+
+
+def upload_preview(futures, api_key, tiered, json_mode, live=False):
+    """Stats and estimate for the finished parses"""
+    prepared = []
+    failed = []
+    for name, future in futures:
+        if not future.done():
+            continue
+        if future.exception():
+            failed.append(f"{name}: {future.exception()}")
+        else:
+            prepared.append((name, future.result()))
+    
+    pending = len(futures) - len(prepared) - len(failed)
+    if pending:
+        st.info(f"⏳ Parsing {pending} of {len(futures)} document(s) in the background...")
+        if not _fragment:
+            st.button("🔄 Refresh")
+    elif live and not st.session_state.get('preview_page_run'):
+        # All parsed: one full rerun swaps in the static preview, which stops the refresh timer.
+        # Never from a page run - that would drop whatever the user just clicked.
+        st.rerun()
+    for error in failed:
+        st.error(f"❌ Could not read {error}")
+    if not prepared:
+        return
+    
+    if len(futures) == 1:
+        stats = prepared[0][1].stats()
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("📑 Pages", stats['pages'])
+        col2.metric("📝 Words", f"{stats['words']:,}")
+        col3.metric("🔢 Tokens", f"{stats['tokens']:,}")
+        col4.metric("⏱️ Parsed In", f"{stats['seconds']:.2f}s")
+        if stats['blank_pages']:
+            st.warning(f"⚠️ {stats['blank_pages']} page(s) have no text layer (scanned?)")
+        if stats['tables']:
+            st.info(f"📐 {stats['tables']} table(s) found - they go straight to their own sheets "
+                    f"instead of the AI prompt")
+    else:
+        st.dataframe(pd.DataFrame([
+            {"File": name, "Pages": stats['pages'], "Blank Pages": stats['blank_pages'],
+             "Words": stats['words'], "Tokens": stats['tokens'], "Chunks": stats['chunks'],
+             "Tables": stats['tables']}
+            for name, stats in ((name, doc.stats()) for name, doc in prepared)
+        ]), hide_index=True, use_container_width=True)
+    
+    estimates = []
+    scanned = []
+    for name, doc in prepared:
+        estimate = estimate_prepared(name, doc, tiered, json_mode)
+        if estimate is None:
+            scanned.append(name)
+        else:
+            estimates.append(estimate)
+    if not pending:
+        render_estimate(estimates, scanned, api_key, tiered)
+
+
+def render_batch(uploaded_files, api_key, tiered, tier_threshold, use_ocr, json_mode,
+                 extract_tables):
+    """Queue every uploaded PDF in the background and show live progress"""
+    st.markdown(f"### 📚 Batch: {len(uploaded_files)} documents")
+    st.info("**Files:** " + ", ".join(f.name for f in uploaded_files))
+    
+    if st.button("🚀 Queue All for Extraction", use_container_width=True, type="primary"):
+        store = get_result_store()
+        inflight = get_inflight()
+        pool = get_client_pool(api_key)
+        row_index = get_row_index()
+        prefetcher = get_prefetcher()
+        ocr = get_ocr() if use_ocr else None
         
-        # Check for nulls
-        if self.df['Key'].isna().sum() > 0:
-            score -= 20
-        if self.df['Value'].isna().sum() > 0:
-            score -= 20
+        def pipeline(job):
+            digest = content_hash(job.data)
+            key = result_key(digest, use_ocr, extract_tables, json_mode, tiered, tier_threshold)
+            cached = store.get(key)
+            if cached:
+                job.df, job.excel = cached['df'], cached['excel']
+                job.score = cached['metrics']['score']
+                return
             
-        # Check duplicates
-        if self.df.duplicated(subset=['Key']).sum() > 0:
-            score -= 10
-            
-        return max(0, score)
-    
-    def evaluate_keys(self):
-        """Evaluate key quality"""
-        keys = self.df['Key'].tolist()
-        good_patterns = ['name', 'date', 'birth', 'age', 'salary', 'education', 
-                        'certification', 'skill', 'organization', 'designation']
+            converter = PDFToExcelConverter(api_key,
+                                            json_mode="json_object" if json_mode else None,
+                                            client=pool.for_job(job.id))
+            job.set_status(PARSING)
+            parsed = prefetcher.get((digest, bool(use_ocr), bool(extract_tables)))
+            if parsed is not None:
+                prepared = parsed.result()
+            else:
+                prepared = prepare_document(job.data, ocr, tables=extract_tables)
+            pdf_text = prepared.text
+            job.set_status(LLM)
+            structured_data, _ = extract_once(inflight, api_key, converter, pdf_text,
+                                              tiered, tier_threshold, prepared.chunks)
+            job.set_status(WRITING)
+            job.df = converter.create_excel(structured_data)
+            job.excel = to_excel_bytes(job.df, prepared.tables).getvalue()
+            metrics = evaluate_quality(job.df, pdf_text)
+            job.score = metrics['score']
+            store.put(key, job.name, job.df, metrics, job.excel)
+            index_result(row_index, job.name, digest, structured_data)
         
-        meaningful = sum(1 for k in keys if any(p in str(k).lower() for p in good_patterns))
-        return (meaningful / len(keys) * 100) if keys else 0
+        queue = get_job_queue()
+        queue.forget(st.session_state.get('job_ids', []))
+        st.session_state['job_ids'] = [
+            queue.submit(f.name, f.getvalue(), pipeline).id for f in uploaded_files
+        ]
     
-    def get_overall_score(self):
-        """Calculate overall quality score"""
-        completeness = self.evaluate_completeness()
-        structure = self.evaluate_structure()
-        key_quality = self.evaluate_keys()
-        
-        overall = (completeness * 0.5) + (structure * 0.3) + (key_quality * 0.2)
-        return round(overall, 1)
+    render_job_progress()
 
 
 def main():
@@ -251,6 +630,35 @@ def main():
             help="Get your free API key from console.groq.com"
         )
         
+        tiered = st.checkbox(
+            "⚡ Tiered extraction",
+            help="Try a small, fast model first and escalate only low-scoring chunks to the large model"
+        )
+        tier_threshold = st.slider(
+            "Escalation threshold",
+            min_value=0, max_value=100, value=int(DEFAULT_THRESHOLD),
+            disabled=not tiered,
+            help="Chunks scoring below this (DataEvaluator overall score) go to the large model"
+        )
+        json_mode = st.checkbox(
+            "🧩 Schema-validated JSON",
+            help="Use JSON mode, validate every row and re-request only a truncated tail "
+                 "instead of failing the whole document"
+        )
+        extract_tables = st.checkbox(
+            "📐 Extract tables locally",
+            disabled=not TABLES_AVAILABLE,
+            help="Detect tables from the PDF layout, put them on their own sheets and leave them "
+                 "out of the AI prompt" if TABLES_AVAILABLE
+                 else "Install pymupdf or pdfminer.six to enable table extraction"
+        )
+        use_ocr = st.checkbox(
+            "🔍 OCR scanned pages",
+            disabled=not OCR_AVAILABLE,
+            help="Run Tesseract on pages without a text layer" if OCR_AVAILABLE
+                 else "Install pytesseract, Pillow and Tesseract to enable OCR"
+        )
+        
         st.markdown("---")
         st.markdown("""
         ### 📋 How it works:
@@ -267,7 +675,13 @@ def main():
         """)
         
         st.markdown("---")
-        st.info("💡 **Tip:** Make sure your PDF contains readable text (not scanned images)")
+        st.info("💡 **Tip:** Scanned PDFs need the OCR option enabled above")
+        
+        if api_key:
+            pool = get_client_pool(api_key)
+            if len(pool.endpoints) > 1:
+                with st.expander(f"🔌 LLM Endpoints ({len(pool.endpoints)})"):
+                    st.dataframe(pd.DataFrame(pool.stats()), hide_index=True)
     
     # Main content
     if not api_key:
@@ -279,13 +693,22 @@ def main():
     col1, col2, col3 = st.columns([1, 2, 1])
     
     with col2:
-        uploaded_file = st.file_uploader(
-            "📤 Upload PDF Document",
+        uploaded_files = st.file_uploader(
+            "📤 Upload PDF Documents",
             type=['pdf'],
-            help="Upload a PDF file containing text data"
+            accept_multiple_files=True,
+            help="Upload one PDF, or several to convert them in the background"
         )
     
-    if uploaded_file:
+    uploaded_file = uploaded_files[0] if len(uploaded_files) == 1 else None
+    if uploaded_files:
+        render_upload_preview(uploaded_files, api_key, tiered, json_mode, use_ocr, extract_tables)
+    
+    if len(uploaded_files) > 1:
+        render_batch(uploaded_files, api_key, tiered, tier_threshold, use_ocr, json_mode,
+                     extract_tables)
+    
+    elif uploaded_file:
         # Create two columns for layout
         left_col, right_col = st.columns([1, 1])
         
@@ -295,50 +718,71 @@ def main():
             st.info(f"**Size:** {uploaded_file.size / 1024:.2f} KB")
             
             if st.button("🚀 Start Extraction", use_container_width=True, type="primary"):
-                with st.spinner("🔄 Processing document..."):
-                    try:
-                        # Initialize converter
-                        converter = PDFToExcelConverter(api_key)
-                        
-                        # Progress bar
-                        progress_bar = st.progress(0)
-                        status_text = st.empty()
+                digest, parsed = prefetch_upload(uploaded_file, use_ocr, extract_tables)
+                key = result_key(digest, use_ocr, extract_tables, json_mode, tiered,
+                                 tier_threshold)
+                store = get_result_store()
+                cached = store.get(key)
+                
+                if cached:
+                    load_result(cached)
+                    st.success("⚡ This document was converted before - loaded instantly!")
+                else:
+                    with st.spinner("🔄 Processing document..."):
+                        try:
+                            # Initialize converter
+                            converter = PDFToExcelConverter(
+                                api_key, json_mode="json_object" if json_mode else None,
+                                client=get_client_pool(api_key).for_job(session_job_id()))
                         
-                        # Step 1: Extract text
-                        status_text.text("📖 Reading PDF...")
-                        progress_bar.progress(25)
-                        pdf_text = converter.extract_text_from_pdf(uploaded_file)
+                            # Progress bar
+                            progress_bar = st.progress(0)
+                            status_text = st.empty()
                         
-                        # Step 2: AI processing
-                        status_text.text("🤖 AI is analyzing document...")
-                        progress_bar.progress(50)
-                        structured_data = converter.extract_structured_data(pdf_text)
+                            # Step 1: Extract text (usually already parsed in the background)
+                            status_text.text("📖 Reading PDF...")
+                            progress_bar.progress(25)
+                            prepared = parsed.result()
+                            pdf_text = prepared.text
                         
-                        # Step 3: Create Excel
-                        status_text.text("📊 Creating Excel file...")
-                        progress_bar.progress(75)
-                        df = converter.create_excel(structured_data)
+                            # Step 2: AI processing
+                            status_text.text("🤖 AI is analyzing document...")
+                            progress_bar.progress(50)
+                            structured_data, tier_report = extract_once(
+                                get_inflight(), api_key, converter, pdf_text, tiered,
+                                tier_threshold, prepared.chunks)
+                            if tier_report:
+                                st.session_state['tier_report'] = tier_report
+                            else:
+                                st.session_state.pop('tier_report', None)
                         
-                        # Step 4: Evaluate
-                        status_text.text("✅ Evaluating quality...")
-                        progress_bar.progress(100)
-                        evaluator = DataEvaluator(df, pdf_text)
-                        overall_score = evaluator.get_overall_score()
+                            # Step 3: Create Excel
+                            status_text.text("📊 Creating Excel file...")
+                            progress_bar.progress(75)
+                            df = converter.create_excel(structured_data)
                         
-                        # Store in session state
-                        st.session_state['df'] = df
-                        st.session_state['score'] = overall_score
-                        st.session_state['completeness'] = evaluator.evaluate_completeness()
-                        st.session_state['structure'] = evaluator.evaluate_structure()
-                        st.session_state['key_quality'] = evaluator.evaluate_keys()
+                            # Step 4: Evaluate
+                            status_text.text("✅ Evaluating quality...")
+                            progress_bar.progress(100)
+                            metrics = evaluate_quality(df, pdf_text)
+
+                            # Store in session state and the shared result store
+                            excel = to_excel_bytes(df, prepared.tables).getvalue()
+                            st.session_state['df'] = df
+                            st.session_state['excel'] = excel
+                            st.session_state['tables'] = prepared.tables
+                            st.session_state.update(metrics)
+                            store.put(key, uploaded_file.name, df, metrics, excel)
+                            index_result(get_row_index(), uploaded_file.name, digest,
+                                         structured_data)
                         
-                        status_text.empty()
-                        progress_bar.empty()
+                            status_text.empty()
+                            progress_bar.empty()
                         
-                        st.success("✅ Extraction completed successfully!")
+                            st.success("✅ Extraction completed successfully!")
                         
-                    except Exception as e:
-                        st.error(f"❌ Error: {str(e)}")
+                        except Exception as e:
+                            st.error(f"❌ Error: {str(e)}")
         
         # Display results if available
         if 'df' in st.session_state:
@@ -393,6 +837,18 @@ def main():
             # Full width sections
             st.markdown("---")
             
+            if 'tier_report' in st.session_state:
+                with st.expander("⚡ Tiered Extraction Stats"):
+                    st.dataframe(pd.DataFrame(st.session_state['tier_report']),
+                                 use_container_width=True)
+            
+            if st.session_state.get('tables'):
+                tables = st.session_state['tables']
+                with st.expander(f"📐 Tables Extracted Locally ({len(tables)})"):
+                    for table, name in zip(tables, table_sheet_names(tables)):
+                        st.markdown(f"**{name}**")
+                        st.dataframe(table.to_frame(), use_container_width=True, hide_index=True)
+            
             # Preview section
             st.markdown("### 👀 Data Preview")
             st.dataframe(
@@ -427,11 +883,8 @@ def main():
             col1, col2, col3 = st.columns([1, 1, 1])
             
             with col2:
-                # Create Excel file in memory
-                output = io.BytesIO()
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                    st.session_state['df'].to_excel(writer, sheet_name='Output', index=False)
-                output.seek(0)
+                # Excel file built when the result was produced (includes any table sheets)
+                output = st.session_state.get('excel') or to_excel_bytes(st.session_state['df'])
                 
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 filename = f"structured_output_{timestamp}.xlsx"
@@ -461,6 +914,8 @@ def main():
                 </p>
             </div>
         """, unsafe_allow_html=True)
+    
+    render_recent_conversions()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+"""
+Multi-document request packing for small PDFs.
+One- or two-page forms are smaller than the instruction block that goes
+with them, so several of them are sent in a single request with clearly
+delimited document IDs, and the keyed response is split back into one
+row list per document.
+"""
+
+import json
+from structured_output import validate_row
+
+SMALL_DOC_TOKENS = 1500       # documents at most this size are worth packing
+DEFAULT_PACK_TOKENS = 3000    # document text per packed request (the rows come back ~2x larger)
+
+BATCH_PROMPT = """You are an expert data extraction system. Below are {count} separate documents, each delimited by BEGIN/END markers with a document ID. Extract ALL information from EACH document and structure it into key-value pairs with optional comments.
+
+CRITICAL REQUIREMENTS:
+1. Extract 100% of the content of every document - nothing should be missed
+2. Identify logical key names (e.g., "First Name", "Date of Birth", "Current Salary")
+3. Extract corresponding values
+4. Add contextual information as comments where relevant
+5. Preserve original wording from the text
+6. Do NOT summarize or omit any information
+7. Never mix rows between documents - each row belongs to exactly one document ID
+
+{documents}
+
+Respond with a single JSON object keyed by document ID, one entry for EVERY document:
+{{
+  "DOC1": [{{"key": "First Name", "value": "Vijay", "comments": ""}}, ...],
+  "DOC2": [{{"key": "Invoice Number", "value": "INV-0042", "comments": ""}}, ...]
+}}"""
+
+
+def estimate_text_tokens(text):
+    """Rough token count (about 4 chars per token)"""
+    return len(text) // 4
+
+
+def pack_documents(docs, token_budget=DEFAULT_PACK_TOKENS, small_tokens=SMALL_DOC_TOKENS):
+    """
+    Group (name, text) pairs into packed batches of small documents.
+    Returns (batches, singles): batches hold two or more documents whose
+    combined text fits token_budget; everything else is in singles.
+    """
+    batches = []
+    singles = []
+    current = []
+    current_tokens = 0
+    for name, text in docs:
+        tokens = estimate_text_tokens(text)
+        if tokens > min(small_tokens, token_budget) or not text.strip():
+            singles.append((name, text))
+            continue
+        if current and current_tokens + tokens > token_budget:
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append((name, text))
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+
+    # A "batch" of one saves nothing - send it the normal way
+    singles.extend(batch[0] for batch in batches if len(batch) == 1)
+    return [batch for batch in batches if len(batch) > 1], singles
+
+
+def build_batch_prompt(docs):
+    """Prompt for a packed batch; documents are numbered DOC1..DOCn"""
+    sections = []
+    for number, (_, text) in enumerate(docs, start=1):
+        doc_id = f"DOC{number}"
+        sections.append(f"=== BEGIN DOCUMENT {doc_id} ===\n{text.strip()}\n=== END DOCUMENT {doc_id} ===")
+    return BATCH_PROMPT.format(count=len(docs), documents="\n\n".join(sections))
+
+
+class BatchPacker:
+    def __init__(self, client, max_tokens=8000):
+        self.client = client
+        self.max_tokens = max_tokens
+        self.requests = 0
+
+    def extract_batch(self, docs, model):
+        """
+        One request for a packed batch of (name, text) pairs.
+        Returns {name: rows} for the documents the model answered cleanly;
+        anything missing or malformed should be re-extracted on its own.
+        """
+        self.requests += 1
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": build_batch_prompt(docs)}],
+            response_format={"type": "json_object"},
+            max_tokens=self.max_tokens,
+            temperature=0.1
+        )
+        choice = response.choices[0]
+        if getattr(choice, "finish_reason", None) == "length":
+            return {}
+        try:
+            answer = json.loads(choice.message.content or "")
+        except json.JSONDecodeError:
+            return {}
+        if not isinstance(answer, dict):
+            return {}
+
+        results = {}
+        for number, (name, _) in enumerate(docs, start=1):
+            rows = answer.get(f"DOC{number}")
+            if not isinstance(rows, list) or not rows:
+                continue
+            valid = [validate_row(row) for row in rows]
+            if all(row is not None for row in valid):
+                results[name] = valid
+        return results
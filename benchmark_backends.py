@@ -0,0 +1,77 @@
+"""
+PDF Backend Benchmark
+Compares pages/second and text fidelity of every installed text backend
+against PyPDF2 (the original extractor) on the sample PDF
+"""
+
+import argparse
+import difflib
+import re
+import time
+from pdf_backends import BACKEND_NAMES, available_backends, read_pdf_bytes
+
+REFERENCE_BACKEND = "pypdf2"
+
+
+def normalize(text):
+    """Collapse whitespace so layout differences don't dominate the diff"""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def time_backend(backend, data, repeat):
+    """Best-of-N wall time to extract every page"""
+    best = None
+    pages = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        doc = backend.open(data)
+        pages = [backend.page_text(doc, i) or "" for i in range(backend.page_count(doc))]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF text backends")
+    parser.add_argument("pdf", nargs="?", default="Sample_Data_Input.pdf")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per backend (best is kept)")
+    args = parser.parse_args()
+
+    data = read_pdf_bytes(args.pdf)
+    backends = available_backends(BACKEND_NAMES)
+    print(f"📄 Benchmarking {len(backends)} backend(s) on {args.pdf} (best of {args.repeat})\n")
+
+    results = {}
+    for backend in backends:
+        try:
+            results[backend.name] = time_backend(backend, data, args.repeat)
+        except Exception as e:
+            print(f"   ❌ {backend.name}: {e}")
+
+    reference = results.get(REFERENCE_BACKEND)
+    reference_text = normalize("".join(reference[1])) if reference else None
+
+    print(f"{'Backend':<10} {'Pages':>6} {'Seconds':>9} {'Pages/s':>9} {'Chars':>8} "
+          f"{'Δ Chars':>8} {'Similarity':>11}")
+    print("-" * 66)
+    for name, (seconds, pages) in results.items():
+        text = normalize("".join(pages))
+        pages_per_second = len(pages) / seconds if seconds else float('inf')
+        if reference_text is not None:
+            delta = f"{len(text) - len(reference_text):+d}"
+            similarity = difflib.SequenceMatcher(None, reference_text, text, autojunk=False).ratio()
+            similarity = f"{similarity * 100:.1f}%"
+        else:
+            delta = similarity = "n/a"
+        print(f"{name:<10} {len(pages):>6} {seconds:>9.4f} {pages_per_second:>9.1f} {len(text):>8} "
+              f"{delta:>8} {similarity:>11}")
+
+    if reference_text is None:
+        print(f"\n⚠️  {REFERENCE_BACKEND} not installed - fidelity deltas unavailable")
+    else:
+        print(f"\nΔ Chars and Similarity are relative to {REFERENCE_BACKEND} "
+              "(whitespace-normalized)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Per-document checkpoint journal.
+An append-only JSON-lines file records the parsed page text and every
+completed LLM chunk, so an interrupted conversion resumes at the first
+incomplete chunk instead of re-parsing and re-paying for every token.
+A header records the extraction options; a journal written under other
+options (OCR, JSON mode, tiers, ...) is discarded rather than replayed.
+"""
+
+import hashlib
+import json
+import os
+import time
+from rows import to_rows, rows_to_dicts
+
+DEFAULT_JOURNAL_DIR = os.path.join(".cache", "journal")
+
+
+def chunk_hash(chunk_text):
+    """Identifies a chunk, so a journal is never replayed onto different chunking"""
+    return hashlib.sha256(chunk_text.encode('utf-8')).hexdigest()
+
+
+class CheckpointJournal:
+    def __init__(self, path, options=None, fsync_every=4, fsync_interval=2.0):
+        """
+        options: JSON-serializable settings the journal is only valid for.
+        Records are flushed to the OS on every write and fsync'd in batches:
+        after fsync_every records or fsync_interval seconds, whichever comes first.
+        """
+        self.path = path
+        self.options = options
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.pages = None
+        self.chunks = {}
+        self.file = None
+        self.pending = 0
+        self.last_sync = time.monotonic()
+        self._load()
+
+    @classmethod
+    def for_document(cls, digest, journal_dir=DEFAULT_JOURNAL_DIR, **kwargs):
+        """Journal for a document, keyed by the PDF content hash"""
+        os.makedirs(journal_dir, exist_ok=True)
+        return cls(os.path.join(journal_dir, f"{digest}.jsonl"), **kwargs)
+
+    def _load(self):
+        """Replay an existing journal; a torn final record is ignored"""
+        if not os.path.exists(self.path):
+            return
+        options = None
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if record["type"] == "header":
+                    options = record["options"]
+                elif record["type"] == "pages":
+                    self.pages = record["pages"]
+                elif record["type"] == "chunk":
+                    self.chunks[record["index"]] = record
+        
+        if options != self.options:
+            # Written under different settings - its pages and rows don't apply
+            self.pages = None
+            self.chunks = {}
+            os.remove(self.path)
+
+    @property
+    def resumed(self):
+        return self.pages is not None
+
+    def completed_rows(self, index, chunk_text):
+        """Rows recorded for this chunk, or None if it still needs the LLM"""
+        record = self.chunks.get(index)
+        if record is None or record["hash"] != chunk_hash(chunk_text):
+            return None
+        return to_rows(record["rows"])
+
+    def _append(self, record):
+        if self.file is None:
+            new = not os.path.exists(self.path)
+            self.file = open(self.path, "a", encoding='utf-8')
+            if new:
+                self.file.write(json.dumps({"type": "header", "options": self.options}) + "\n")
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+        self.pending += 1
+        if (self.pending >= self.fsync_every
+                or time.monotonic() - self.last_sync >= self.fsync_interval):
+            self.sync()
+
+    def sync(self):
+        """Force pending records to disk"""
+        if self.file is not None and self.pending:
+            os.fsync(self.file.fileno())
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def record_pages(self, pages):
+        self.pages = pages
+        self._append({"type": "pages", "pages": pages})
+
+    def record_chunk(self, index, chunk_text, rows):
+        record = {"type": "chunk", "index": index, "hash": chunk_hash(chunk_text),
+                  "rows": rows_to_dicts(rows)}
+        self.chunks[index] = record
+        self._append(record)
+
+    def close(self):
+        """Sync and close, keeping the journal for the next run"""
+        if self.file is not None:
+            self.sync()
+            self.file.close()
+            self.file = None
+
+    def commit(self):
+        """Final output is written - compact the journal away"""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self.pages = None
+        self.chunks = {}
@@ -0,0 +1,255 @@
+"""
+Multi-key / multi-endpoint LLM client pool.
+Spreads chat completion requests over several Groq API keys and
+OpenAI-compatible endpoints (including local servers) by least
+outstanding tokens, tracks per-endpoint health and rate limits, and
+schedules fairly between concurrent jobs so one huge document can't
+starve small ones.
+
+Configure with environment variables:
+    GROQ_API_KEYS=key1,key2,...
+    LLM_ENDPOINTS=http://localhost:8000/v1|token|model,https://host/v1|key
+"""
+
+import itertools
+import os
+import threading
+import time
+from groq import Groq
+
+DEFAULT_MAX_IN_FLIGHT = 4
+BASE_COOLDOWN = 5.0
+MAX_COOLDOWN = 60.0
+
+
+def estimate_tokens(kwargs):
+    """Rough prompt + completion budget of a request (about 4 chars per token)"""
+    prompt_chars = sum(len(message.get("content") or "") for message in kwargs.get("messages", []))
+    return prompt_chars // 4 + kwargs.get("max_tokens", 0)
+
+
+def _status_code(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def _endpoint_fault(error):
+    """True when the endpoint, not the request, is to blame (retry elsewhere)"""
+    status = _status_code(error)
+    if status is None:
+        return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+    return status in (401, 403, 408, 429) or status >= 500
+
+
+def _retry_after(error):
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class Endpoint:
+    def __init__(self, name, client, model=None, max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+        self.name = name
+        self.client = client
+        self.model = model
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.outstanding_tokens = 0
+        self.completed = 0
+        self.tokens_served = 0
+        self.failures = 0
+        self.disabled = False
+        self.cooldown_until = 0.0
+        self.last_error = ""
+
+    def available(self, now):
+        return (not self.disabled and now >= self.cooldown_until
+                and self.in_flight < self.max_in_flight)
+
+    def stats(self, now):
+        if self.disabled:
+            state = "disabled"
+        elif now < self.cooldown_until:
+            state = f"cooling {self.cooldown_until - now:.0f}s"
+        else:
+            state = "healthy"
+        return {
+            "Endpoint": self.name,
+            "State": state,
+            "In Flight": self.in_flight,
+            "Outstanding Tokens": self.outstanding_tokens,
+            "Completed": self.completed,
+            "Tokens Served": self.tokens_served,
+            "Failures": self.failures,
+            "Last Error": self.last_error,
+        }
+
+
+class ClientPool:
+    def __init__(self, endpoints):
+        if not endpoints:
+            raise ValueError("ClientPool needs at least one endpoint")
+        self.endpoints = endpoints
+        self.condition = threading.Condition()
+        self.tickets = itertools.count()
+        self.waiting = {}          # job_id -> [ticket, ...] in arrival order
+        self.job_in_flight = {}    # job_id -> requests currently running
+
+    @staticmethod
+    def configured(api_key=None):
+        """(groq_keys, endpoint_specs) from GROQ_API_KEYS / LLM_ENDPOINTS plus api_key"""
+        keys = [key.strip() for key in os.getenv("GROQ_API_KEYS", "").split(",") if key.strip()]
+        if api_key and api_key not in keys:
+            keys.insert(0, api_key)
+        specs = [spec.strip() for spec in os.getenv("LLM_ENDPOINTS", "").split(",") if spec.strip()]
+        return keys, specs
+
+    @classmethod
+    def from_env(cls, api_key=None, max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+        """Pool from GROQ_API_KEYS / LLM_ENDPOINTS plus an explicit api_key"""
+        keys, specs = cls.configured(api_key)
+        endpoints = [
+            Endpoint(f"groq:…{key[-4:]}", Groq(api_key=key, max_retries=0),
+                     max_in_flight=max_in_flight)
+            for key in keys
+        ]
+        for spec in specs:
+            endpoints.append(cls.openai_endpoint(spec, max_in_flight))
+        return cls(endpoints)
+
+    @staticmethod
+    def openai_endpoint(spec, max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+        """Endpoint from 'base_url|api_key|model' (api_key and model optional)"""
+        from openai import OpenAI
+        base_url, _, rest = spec.partition("|")
+        api_key, _, model = rest.partition("|")
+        client = OpenAI(base_url=base_url, api_key=api_key or "none", max_retries=0)
+        return Endpoint(base_url, client, model=model or None, max_in_flight=max_in_flight)
+
+    @property
+    def capacity(self):
+        """Requests the pool can run at once"""
+        return sum(endpoint.max_in_flight for endpoint in self.endpoints if not endpoint.disabled)
+
+    def for_job(self, job_id):
+        """Groq-compatible client whose requests are scheduled under job_id"""
+        return PooledClient(self, job_id)
+
+    # -- scheduling --------------------------------------------------------
+
+    def _next_ticket(self):
+        """Head request of the waiting job with the fewest requests running"""
+        best = None
+        for job_id, tickets in self.waiting.items():
+            rank = (self.job_in_flight.get(job_id, 0), tickets[0])
+            if best is None or rank < best[0]:
+                best = (rank, tickets[0])
+        return best[1] if best else None
+
+    def _pick_endpoint(self, now):
+        candidates = [endpoint for endpoint in self.endpoints if endpoint.available(now)]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda endpoint: (endpoint.outstanding_tokens, endpoint.in_flight))
+
+    def _wait_time(self, now):
+        cooling = [endpoint.cooldown_until - now for endpoint in self.endpoints
+                   if not endpoint.disabled and endpoint.cooldown_until > now]
+        return min(cooling) if cooling else None
+
+    def acquire(self, job_id, tokens):
+        """Block until it's this job's turn and an endpoint is free"""
+        with self.condition:
+            ticket = next(self.tickets)
+            self.waiting.setdefault(job_id, []).append(ticket)
+            try:
+                while True:
+                    if all(endpoint.disabled for endpoint in self.endpoints):
+                        raise RuntimeError("All LLM endpoints are disabled: " + "; ".join(
+                            f"{endpoint.name}: {endpoint.last_error}" for endpoint in self.endpoints))
+                    now = time.monotonic()
+                    endpoint = self._pick_endpoint(now) if self._next_ticket() == ticket else None
+                    if endpoint is not None:
+                        break
+                    self.condition.wait(timeout=self._wait_time(now))
+            finally:
+                self.waiting[job_id].remove(ticket)
+                if not self.waiting[job_id]:
+                    del self.waiting[job_id]
+
+            endpoint.in_flight += 1
+            endpoint.outstanding_tokens += tokens
+            self.job_in_flight[job_id] = self.job_in_flight.get(job_id, 0) + 1
+            self.condition.notify_all()
+            return endpoint
+
+    def release(self, endpoint, job_id, tokens, error=None):
+        """Return an endpoint, updating its health from the outcome"""
+        with self.condition:
+            endpoint.in_flight -= 1
+            endpoint.outstanding_tokens -= tokens
+            self.job_in_flight[job_id] -= 1
+            if not self.job_in_flight[job_id]:
+                del self.job_in_flight[job_id]
+
+            if error is None:
+                endpoint.completed += 1
+                endpoint.tokens_served += tokens
+                endpoint.failures = 0
+            else:
+                endpoint.failures += 1
+                endpoint.last_error = str(error)[:200]
+                status = _status_code(error)
+                if status in (401, 403):
+                    endpoint.disabled = True
+                else:
+                    backoff = _retry_after(error) or min(
+                        BASE_COOLDOWN * 2 ** (endpoint.failures - 1), MAX_COOLDOWN)
+                    endpoint.cooldown_until = time.monotonic() + backoff
+            self.condition.notify_all()
+
+    def create(self, job_id, **kwargs):
+        """chat.completions.create on the best endpoint, failing over on errors"""
+        tokens = estimate_tokens(kwargs)
+        attempts = max(3, 2 * len(self.endpoints))
+        for attempt in range(attempts):
+            endpoint = self.acquire(job_id, tokens)
+            request = dict(kwargs)
+            if endpoint.model:
+                request["model"] = endpoint.model
+            try:
+                response = endpoint.client.chat.completions.create(**request)
+            except Exception as e:
+                if not _endpoint_fault(e):
+                    # Bad request etc. - the endpoint is fine, the caller handles it
+                    self.release(endpoint, job_id, tokens)
+                    raise
+                self.release(endpoint, job_id, tokens, error=e)
+                if attempt == attempts - 1:
+                    raise
+                continue
+            self.release(endpoint, job_id, tokens)
+            return response
+
+    def stats(self):
+        """Per-endpoint health and load"""
+        with self.condition:
+            now = time.monotonic()
+            return [endpoint.stats(now) for endpoint in self.endpoints]
+
+
+class PooledClient:
+    """Drop-in for Groq(...) - exposes client.chat.completions.create"""
+
+    def __init__(self, pool, job_id):
+        self.pool = pool
+        self.job_id = job_id
+        self.chat = self
+        self.completions = self
+
+    def create(self, **kwargs):
+        return self.pool.create(self.job_id, **kwargs)
@@ -0,0 +1,66 @@
+"""
+Quality metrics shared by the Streamlit app and the extraction pipeline
+"""
+
+import re
+from scoring import RowScores, APP_KEY_PATTERNS
+
+
+class DataEvaluator:
+    def __init__(self, df, pdf_text):
+        self.df = df
+        self.pdf_text = pdf_text
+        self._scores = None
+    
+    @property
+    def scores(self):
+        """Per-row features, computed once and shared by every metric"""
+        if self._scores is None:
+            self._scores = RowScores(self.df, APP_KEY_PATTERNS)
+        return self._scores
+        
+    def evaluate_completeness(self):
+        """Calculate completeness percentage"""
+        output_text = self.scores.output_text()
+        
+        # Check numbers
+        pdf_numbers = re.findall(r'\b\d+[\d\.,]*\b', self.pdf_text)
+        numbers_found = sum(1 for n in pdf_numbers if n in output_text)
+        number_score = (numbers_found / len(pdf_numbers) * 100) if pdf_numbers else 100
+        
+        # Check important words
+        pdf_words = re.findall(r'\b[A-Z][a-z]+\b', self.pdf_text)
+        words_found = sum(1 for w in pdf_words if w in output_text)
+        word_score = (words_found / len(pdf_words) * 100) if pdf_words else 100
+        
+        return (number_score + word_score) / 2
+    
+    def evaluate_structure(self):
+        """Evaluate structure quality"""
+        summary = self.scores.summary
+        score = 100
+        
+        # Check for nulls
+        if summary['null_keys'] > 0:
+            score -= 20
+        if summary['null_values'] > 0:
+            score -= 20
+            
+        # Check duplicates
+        if summary['duplicate_key_rows'] > 0:
+            score -= 10
+            
+        return max(0, score)
+    
+    def evaluate_keys(self):
+        """Evaluate key quality"""
+        return self.scores.percent(self.scores.summary['meaningful_keys'])
+    
+    def get_overall_score(self):
+        """Calculate overall quality score"""
+        completeness = self.evaluate_completeness()
+        structure = self.evaluate_structure()
+        key_quality = self.evaluate_keys()
+        
+        overall = (completeness * 0.5) + (structure * 0.3) + (key_quality * 0.2)
+        return round(overall, 1)
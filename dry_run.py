@@ -0,0 +1,131 @@
+"""
+Pre-flight estimates for a conversion, without calling the API.
+Counts the tokens of the exact prompts that would be sent (tiktoken when
+installed, otherwise ~4 chars per token), projects output tokens from the
+document size, and turns the totals into a duration under the configured
+rate limits plus a cost estimate.
+
+Rate limits and prices are per endpoint and can be tuned with:
+    LLM_RPM, LLM_TPM            requests / tokens per minute (default 30 / 12000)
+    LLM_OUTPUT_TPS              generation speed in tokens/s (default 250)
+    LLM_PRICE_IN, LLM_PRICE_OUT $ per million input / output tokens
+"""
+
+import os
+
+MAX_OUTPUT_TOKENS = 8000
+
+# Output rows repeat the text plus JSON punctuation and comments - roughly
+# 1.6 output tokens per token of document text in our sample outputs
+OUTPUT_PER_INPUT = 1.6
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+    TOKENIZER = "tiktoken cl100k_base"
+except Exception:
+    _ENCODING = None
+    TOKENIZER = "~4 chars/token"
+
+
+def count_tokens(text):
+    """Local token count of text"""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class RateLimits:
+    def __init__(self, rpm=None, tpm=None, output_tps=None, price_in=None, price_out=None):
+        self.rpm = rpm or _env_float("LLM_RPM", 30)
+        self.tpm = tpm or _env_float("LLM_TPM", 12000)
+        self.output_tps = output_tps or _env_float("LLM_OUTPUT_TPS", 250)
+        self.price_in = price_in if price_in is not None else _env_float("LLM_PRICE_IN", 0.59)
+        self.price_out = price_out if price_out is not None else _env_float("LLM_PRICE_OUT", 0.79)
+
+
+def estimate_document(name, requests, max_tokens=MAX_OUTPUT_TOKENS):
+    """
+    requests is a list of (prompt, text) pairs - the full prompt that would
+    be sent and the document text inside it. Returns the row for the plan.
+    """
+    input_tokens = 0
+    output_tokens = 0
+    over_cap = 0
+    for prompt, text in requests:
+        input_tokens += count_tokens(prompt)
+        expected = int(count_tokens(text) * OUTPUT_PER_INPUT)
+        if expected > max_tokens:
+            over_cap += 1
+        output_tokens += min(expected, max_tokens)
+    return {
+        "Document": name,
+        "Requests": len(requests),
+        "Input Tokens": input_tokens,
+        "Output Tokens": output_tokens,
+        "Over Output Cap": over_cap,
+    }
+
+
+def project(estimates, endpoints=1, concurrency=4, limits=None):
+    """Totals, projected duration (seconds) and cost for a list of estimate_document rows"""
+    limits = limits or RateLimits()
+    endpoints = max(1, endpoints)
+    requests = sum(row["Requests"] for row in estimates)
+    input_tokens = sum(row["Input Tokens"] for row in estimates)
+    output_tokens = sum(row["Output Tokens"] for row in estimates)
+
+    # The slowest of: request quota, token quota, and generation with
+    # `concurrency` requests in flight per endpoint
+    by_requests = requests / (limits.rpm * endpoints) * 60
+    by_tokens = (input_tokens + output_tokens) / (limits.tpm * endpoints) * 60
+    by_generation = output_tokens / limits.output_tps / (concurrency * endpoints)
+    if requests:
+        # A single request can't finish faster than its own generation time
+        by_generation = max(by_generation, output_tokens / requests / limits.output_tps)
+    seconds = max(by_requests, by_tokens, by_generation)
+
+    return {
+        "documents": len(estimates),
+        "requests": requests,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "seconds": seconds,
+        "limited_by": max((by_requests, "requests/min"), (by_tokens, "tokens/min"),
+                          (by_generation, "generation speed"))[1],
+        "cost": (input_tokens * limits.price_in + output_tokens * limits.price_out) / 1e6,
+        "over_cap": [row["Document"] for row in estimates if row["Over Output Cap"]],
+    }
+
+
+def format_duration(seconds):
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.1f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+def print_plan(estimates, totals, endpoints=1):
+    """CLI report"""
+    print("\n🧮 DRY RUN - no API calls made")
+    print(f"   Tokenizer: {TOKENIZER}, {endpoints} endpoint(s)")
+    for row in estimates:
+        flag = f"  ⚠️  {row['Over Output Cap']} request(s) over output cap" if row["Over Output Cap"] else ""
+        print(f"   • {row['Document']}: {row['Requests']} request(s), "
+              f"{row['Input Tokens']:,} in / ~{row['Output Tokens']:,} out tokens{flag}")
+    print(f"\n   Requests:      {totals['requests']}")
+    print(f"   Input tokens:  {totals['input_tokens']:,}")
+    print(f"   Output tokens: ~{totals['output_tokens']:,}")
+    print(f"   Duration:      ~{format_duration(totals['seconds'])} (limited by {totals['limited_by']})")
+    print(f"   Cost:          ~${totals['cost']:.4f}")
+    if totals["over_cap"]:
+        print(f"\n   ⚠️  Output likely truncated at {MAX_OUTPUT_TOKENS} tokens for: "
+              f"{', '.join(totals['over_cap'])} - use a smaller --chunk-chars or --json-mode")
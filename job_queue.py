@@ -0,0 +1,172 @@
+"""
+Background job queue for converting several PDFs without blocking the UI.
+The queue is process-wide, so it keeps running across Streamlit reruns.
+Finished jobs are evicted once they are older than a time limit, or once
+there are more of them than a count limit (oldest first).
+"""
+
+import io
+import os
+import re
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+QUEUED = "queued"
+PARSING = "parsing"
+LLM = "LLM"
+WRITING = "writing"
+DONE = "done"
+FAILED = "failed"
+
+STAGE_PROGRESS = {QUEUED: 0, PARSING: 25, LLM: 50, WRITING: 75, DONE: 100, FAILED: 100}
+
+DEFAULT_MAX_FINISHED = int(os.getenv("JOB_QUEUE_MAX_FINISHED", "200"))
+DEFAULT_MAX_AGE = float(os.getenv("JOB_QUEUE_MAX_AGE_MIN", "60")) * 60
+
+
+class Job:
+    def __init__(self, name, data):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.data = data
+        self.status = QUEUED
+        self.error = None
+        self.df = None
+        self.excel = None
+        self.score = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+
+    def set_status(self, status):
+        """Move the job to the next pipeline stage"""
+        if self.started is None and status != QUEUED:
+            self.started = time.time()
+        self.status = status
+
+    @property
+    def finished_ok(self):
+        return self.status == DONE
+
+    @property
+    def is_active(self):
+        return self.status not in (DONE, FAILED)
+
+    def as_row(self):
+        """Row for the progress table"""
+        end = self.finished or time.time()
+        elapsed = end - self.started if self.started else 0.0
+        return {
+            "File": self.name,
+            "Status": self.status,
+            "Progress": STAGE_PROGRESS[self.status],
+            "Rows": len(self.df) if self.df is not None else None,
+            "Score": self.score,
+            "Seconds": round(elapsed, 1),
+            "Error": self.error or "",
+        }
+
+
+class JobQueue:
+    def __init__(self, max_workers=4, max_finished=DEFAULT_MAX_FINISHED, max_age=DEFAULT_MAX_AGE):
+        """
+        Thread pool - LLM calls are I/O bound, so threads are enough.
+        Finished jobs are kept for at most max_age seconds, and at most
+        max_finished of them at a time.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-job")
+        self.jobs = {}
+        self.max_finished = max_finished
+        self.max_age = max_age
+        self.lock = threading.Lock()
+
+    def submit(self, name, data, pipeline):
+        """
+        Queue a conversion. pipeline(job) does the work, moving the job
+        through the stages with job.set_status and filling job.df,
+        job.excel and job.score.
+        """
+        job = Job(name, data)
+        with self.lock:
+            self._evict()
+            self.jobs[job.id] = job
+        self.executor.submit(self._run, job, pipeline)
+        return job
+
+    def _run(self, job, pipeline):
+        try:
+            pipeline(job)
+            job.set_status(DONE)
+        except Exception as e:
+            job.error = str(e)
+            job.set_status(FAILED)
+        finally:
+            job.finished = time.time()
+            job.data = None
+            with self.lock:
+                self._evict()
+
+    def _evict(self):
+        """Drop finished jobs past max_age, then the oldest beyond max_finished"""
+        cutoff = time.time() - self.max_age
+        finished = sorted((job for job in self.jobs.values() if job.finished is not None),
+                          key=lambda job: job.finished)
+        for count, job in enumerate(finished):
+            if job.finished < cutoff or len(finished) - count > self.max_finished:
+                del self.jobs[job.id]
+
+    def get(self, job_ids):
+        """Jobs for the given ids, in submission order"""
+        with self.lock:
+            return [self.jobs[job_id] for job_id in job_ids if job_id in self.jobs]
+
+    def forget(self, job_ids):
+        """Drop finished jobs so their results can be garbage collected"""
+        with self.lock:
+            for job_id in job_ids:
+                job = self.jobs.get(job_id)
+                if job is not None and not job.is_active:
+                    del self.jobs[job_id]
+
+
+def _unique_names(jobs, max_len, suffix=""):
+    """File/sheet names derived from the PDF names, de-duplicated"""
+    names = []
+    seen = set()
+    for job in jobs:
+        base = re.sub(r'[\[\]\:\*\?\/\\]', '_', job.name.rsplit('.', 1)[0])
+        base = base[:max_len - len(suffix) - 4] or "output"
+        name = base
+        counter = 2
+        while name.lower() in seen:
+            name = f"{base}_{counter}"
+            counter += 1
+        seen.add(name.lower())
+        names.append(name + suffix)
+    return names
+
+
+def build_zip(jobs):
+    """ZIP archive with one .xlsx per finished job"""
+    finished = [job for job in jobs if job.finished_ok]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for job, name in zip(finished, _unique_names(finished, 200, ".xlsx")):
+            archive.writestr(name, job.excel)
+    buffer.seek(0)
+    return buffer
+
+
+def build_workbook(jobs):
+    """Single workbook with one sheet per finished job"""
+    finished = [job for job in jobs if job.finished_ok]
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        for job, name in zip(finished, _unique_names(finished, 31)):
+            job.df.to_excel(writer, sheet_name=name, index=False)
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,327 @@
+"""
+Concurrent-session load test for the Streamlit app.
+Drives app.py with Streamlit's AppTest - one headless session per simulated
+user, each in its own process because AppTest swaps global Streamlit state
+on every run - against the local mock LLM (mock_llm.py), ramping the number
+of concurrent users. Sessions share the mock LLM and the on-disk result
+store and row index, but not in-process caches (st.cache_resource). For
+every stage it reports per-interaction latency percentiles, memory growth
+per session and CPU, and flags the stage where the app falls over.
+Exceptions from the harness itself are reported apart from app failures.
+Baselines can be saved and compared to catch regressions.
+
+Usage:
+    python load_test.py --users 1,2,4,8
+    python load_test.py --users 1,4 --save-baseline .cache/load_baseline.json
+    python load_test.py --users 1,4 --compare .cache/load_baseline.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(HERE, "app.py")
+INTERACTIONS = ("load", "api_key", "upload", "extract", "rerun")
+
+
+def rss_mb():
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Peak RSS (KB on Linux, bytes on macOS) where /proc isn't available
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_mock_llm(latency, tps):
+    """Mock LLM in a subprocess, so its CPU isn't counted as the app's"""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "mock_llm.py"), "--port", str(port),
+         "--latency", str(latency), "--tps", str(tps)],
+        stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("Mock LLM did not start")
+
+
+class AppFailure(Exception):
+    """The app itself failed: an exception in the script, an error shown, or no result"""
+
+
+class Session:
+    """One simulated user: load, enter key, upload, extract, rerun with the result shown"""
+
+    def __init__(self, name, pdf_bytes, timeout):
+        from streamlit.testing.v1 import AppTest
+        self.name = name
+        self.pdf_bytes = pdf_bytes
+        self.at = AppTest.from_file(APP, default_timeout=timeout)
+        self.timings = {}
+        self.error = None
+        self.harness_error = None
+        self.started = self.finished = None
+
+    def _step(self, interaction, action):
+        start = time.perf_counter()
+        action()
+        self.timings[interaction] = time.perf_counter() - start
+        if self.at.exception:
+            raise AppFailure(self.at.exception[0].value)
+
+    def run(self, barrier):
+        at = self.at
+        try:
+            barrier.wait()
+            self.started = time.time()
+            self._step("load", at.run)
+            self._step("api_key", lambda: at.text_input[0].input("gsk_load_test").run())
+            self._step("upload", lambda: at.file_uploader[0].upload(
+                f"{self.name}.pdf", self.pdf_bytes, "application/pdf").run())
+            start = next(b for b in at.button if "Start Extraction" in b.label)
+            self._step("extract", lambda: start.click().run())
+            errors = [e.value for e in at.error]
+            if errors or "df" not in at.session_state:
+                raise AppFailure(errors[0] if errors else "no result produced")
+            self._step("rerun", at.run)
+        except AppFailure as e:
+            self.error = str(e)
+        except Exception as e:
+            # AppTest lookups, Streamlit internals, the barrier - not the app
+            self.harness_error = f"{type(e).__name__}: {e}"
+        self.finished = time.time()
+
+
+def run_session(name, pdf_bytes, timeout, barrier):
+    """Worker process: one session, returned as a plain dict"""
+    sys.path.insert(0, HERE)
+    result = {"name": name, "timings": {}, "error": None, "harness_error": None}
+    try:
+        # Warm-up run: module imports and shared caches shouldn't count as per-session cost
+        Session("warmup", pdf_bytes, timeout).at.run()
+        session = Session(name, pdf_bytes, timeout)
+    except Exception as e:
+        barrier.abort()
+        result["harness_error"] = f"{type(e).__name__}: {e}"
+        return result
+    rss_before = rss_mb()
+    cpu_before = time.process_time()
+    session.run(barrier)
+    result.update(timings=session.timings, error=session.error,
+                  harness_error=session.harness_error,
+                  started=session.started, finished=session.finished,
+                  cpu_seconds=time.process_time() - cpu_before,
+                  rss_mb=rss_mb(), mb_grown=rss_mb() - rss_before)
+    return result
+
+
+def run_stage(users, pdf_bytes, timeout, stage):
+    """Run `users` concurrent sessions; returns the stage summary"""
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager, \
+            ProcessPoolExecutor(max_workers=users, mp_context=context) as executor:
+        # Sessions start together once every worker has imported Streamlit and the app
+        barrier = manager.Barrier(users, timeout=timeout)
+        # Unique bytes per session so the result store / single-flight can't short-circuit
+        futures = [
+            executor.submit(run_session, f"user{user}",
+                            pdf_bytes + f"\n%load-test stage {stage} user {user}\n".encode(),
+                            timeout, barrier)
+            for user in range(users)
+        ]
+        sessions = []
+        for user, future in enumerate(futures):
+            try:
+                sessions.append(future.result())
+            except Exception as e:   # the worker process died
+                sessions.append({"name": f"user{user}", "timings": {}, "error": None,
+                                 "harness_error": f"{type(e).__name__}: {e}"})
+    measured = [session for session in sessions if session.get("started")]
+    # From the barrier releasing to the last session finishing
+    wall = (max(s["finished"] for s in measured) - min(s["started"] for s in measured)
+            if measured else 0.0)
+
+    summary = {
+        "users": users,
+        "ok": sum(1 for session in sessions
+                  if not (session["error"] or session["harness_error"])),
+        "errors": [f"{session['name']}: {session['error']}"
+                   for session in sessions if session["error"]],
+        "harness_errors": [f"{session['name']}: {session['harness_error']}"
+                           for session in sessions if session["harness_error"]],
+        "wall_seconds": round(wall, 2),
+        "cpu_percent": round(sum(s["cpu_seconds"] for s in measured) / wall * 100, 1) if wall else 0.0,
+        "rss_mb": round(sum(s["rss_mb"] for s in measured), 1),
+        "mb_per_session": round(sum(s["mb_grown"] for s in measured) / len(measured), 2)
+                          if measured else 0.0,
+        "latency": {},
+    }
+    for interaction in INTERACTIONS:
+        values = [session["timings"][interaction] for session in sessions
+                  if interaction in session["timings"]]
+        summary["latency"][interaction] = {
+            "p50": round(percentile(values, 50), 3),
+            "p95": round(percentile(values, 95), 3),
+            "max": round(max(values), 3) if values else 0.0,
+        }
+    return summary
+
+
+def print_stage(summary):
+    print(f"\n👥 {summary['users']} concurrent session(s): {summary['ok']} ok, "
+          f"{len(summary['errors'])} failed, {len(summary['harness_errors'])} harness error(s) "
+          f"in {summary['wall_seconds']}s")
+    print(f"   CPU {summary['cpu_percent']}%  |  RSS {summary['rss_mb']} MB  |  "
+          f"+{summary['mb_per_session']} MB/session")
+    print(f"   {'interaction':<12}{'p50':>9}{'p95':>9}{'max':>9}")
+    for interaction, stats in summary["latency"].items():
+        print(f"   {interaction:<12}{stats['p50']:>8.3f}s{stats['p95']:>8.3f}s{stats['max']:>8.3f}s")
+    for error in summary["errors"][:5]:
+        print(f"   ❌ {error}")
+    for error in summary["harness_errors"][:5]:
+        print(f"   🔧 harness: {error}")
+
+
+def breaking_point(stages, slo):
+    """First stage with app failures or an extract p95 over the SLO (harness errors don't count)"""
+    for summary in stages:
+        if summary["errors"]:
+            return summary["users"], f"{len(summary['errors'])} session(s) failed"
+        p95 = summary["latency"]["extract"]["p95"]
+        if p95 > slo:
+            return summary["users"], f"extract p95 {p95:.2f}s > SLO {slo:.2f}s"
+    return None, None
+
+
+def compare(stages, baseline, tolerance, slack=0.05):
+    """Regressions against a saved baseline: p95 worse by more than tolerance (+ slack seconds)"""
+    previous = {stage["users"]: stage for stage in baseline["stages"]}
+    regressions = []
+    for summary in stages:
+        base = previous.get(summary["users"])
+        if base is None:
+            continue
+        for interaction, stats in summary["latency"].items():
+            before = base["latency"].get(interaction, {}).get("p95")
+            if before is not None and stats["p95"] > before * (1 + tolerance) + slack:
+                regressions.append(f"{summary['users']} users / {interaction}: "
+                                   f"p95 {before:.3f}s -> {stats['p95']:.3f}s")
+        if len(summary["errors"]) > len(base["errors"]):
+            regressions.append(f"{summary['users']} users: {len(base['errors'])} -> "
+                               f"{len(summary['errors'])} failed sessions")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test app.py with concurrent headless sessions")
+    parser.add_argument("--users", default="1,2,4,8",
+                        help="Comma-separated concurrent session counts to ramp through")
+    parser.add_argument("--pdf", default=os.path.join(HERE, "Sample_Data_Input.pdf"))
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Mock LLM seconds per request")
+    parser.add_argument("--llm-tps", type=float, default=0.0, help="Mock LLM output tokens/s (0 = instant)")
+    parser.add_argument("--slo", type=float, default=15.0,
+                        help="Extract p95 (seconds) above which a stage counts as falling over")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-interaction timeout")
+    parser.add_argument("--save-baseline", help="Write the results as a baseline JSON")
+    parser.add_argument("--compare", help="Baseline JSON to check for regressions (exit 1 if any)")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed p95 slowdown vs the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    with open(args.pdf, "rb") as f:
+        pdf_bytes = f.read()
+
+    mock, url = start_mock_llm(args.llm_latency, args.llm_tps)
+    workdir = tempfile.mkdtemp(prefix="load-test-")
+    # Every Groq client in the app talks to the mock; caches start empty
+    os.environ.update({
+        "GROQ_BASE_URL": url,
+        "GROQ_API_KEYS": "",
+        "LLM_ENDPOINTS": "",
+        "RESULT_STORE_PATH": os.path.join(workdir, "results.sqlite3"),
+        "ROW_INDEX_PATH": os.path.join(workdir, "row_index.sqlite3"),
+    })
+
+    print("=" * 60)
+    print(f"🏋️  LOAD TEST: {os.path.basename(args.pdf)} against mock LLM {url}")
+    print("=" * 60)
+
+    stages = []
+    try:
+        # Warm-up stage: creates the result store / row index before anything is timed
+        run_stage(1, pdf_bytes, args.timeout, "warmup")
+        for stage, users in enumerate(int(n) for n in args.users.split(",") if n.strip()):
+            summary = run_stage(users, pdf_bytes, args.timeout, stage)
+            print_stage(summary)
+            stages.append(summary)
+    finally:
+        mock.terminate()
+        mock.wait()
+
+    users, reason = breaking_point(stages, args.slo)
+    print("\n" + "=" * 60)
+    if users is None:
+        print(f"✅ Held up through {stages[-1]['users'] if stages else 0} concurrent sessions")
+    else:
+        print(f"💥 Falls over at {users} concurrent sessions: {reason}")
+    harness_errors = sum(len(stage["harness_errors"]) for stage in stages)
+    if harness_errors:
+        print(f"🔧 {harness_errors} session(s) hit harness errors - not counted as app failures")
+
+    results = {"pdf": os.path.basename(args.pdf), "llm_latency": args.llm_latency,
+               "stages": stages}
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.save_baseline) or ".", exist_ok=True)
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(stages, json.load(f), args.tolerance)
+        if regressions:
+            print("📉 Regressions vs baseline:")
+            for regression in regressions:
+                print(f"   • {regression}")
+            print("=" * 60)
+            sys.exit(1)
+        print("📈 No regressions vs baseline")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Local mock LLM backend for load tests and offline development.
+Serves an OpenAI/Groq-compatible /chat/completions endpoint that turns the
+prompt's document text into Key/Value/Comments rows (one per "Key: Value"
+line) after a configurable latency, so the whole pipeline can run without
+an API key or quota.
+
+Usage:
+    python mock_llm.py --port 8765 --latency 0.5 --tps 400
+    export GROQ_BASE_URL=http://127.0.0.1:8765          # Groq clients
+    export LLM_ENDPOINTS="http://127.0.0.1:8765/v1|mock" # or as a pool endpoint
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_DOC_SECTION = re.compile(r'=== BEGIN DOCUMENT (DOC\d+) ===\n(.*?)\n=== END DOCUMENT \1 ===', re.S)
+
+
+def _document_text(prompt):
+    """The document part of an extraction prompt"""
+    for marker in ("TEXT TO EXTRACT:", "TEXT:"):
+        if marker in prompt:
+            text = prompt.split(marker, 1)[1]
+            return text.split("\n\nReturn ONLY", 1)[0].split("\n\nRespond with", 1)[0]
+    return prompt
+
+
+def mock_rows(text):
+    """Deterministic rows for a piece of text: 'Key: Value' lines, else numbered lines"""
+    rows = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        key, sep, value = line.partition(":")
+        if sep and key.strip() and len(key) < 60:
+            rows.append({"key": key.strip(), "value": value.strip(), "comments": ""})
+        else:
+            rows.append({"key": f"Line {len(rows) + 1}", "value": line, "comments": ""})
+    return rows
+
+
+def mock_completion(request):
+    """Response body content for a chat completion request"""
+    prompt = "".join(message.get("content") or "" for message in request.get("messages", []))
+    documents = _DOC_SECTION.findall(prompt)
+    if documents:
+        return json.dumps({doc_id: mock_rows(text) for doc_id, text in documents})
+    rows = mock_rows(_document_text(prompt))
+    if (request.get("response_format") or {}).get("type") in ("json_object", "json_schema"):
+        return json.dumps({"rows": rows})
+    return json.dumps(rows)
+
+
+class MockLLMServer:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.2, tps=0.0):
+        """latency: fixed seconds per request; tps: simulated output tokens/s (0 = instant)"""
+        self.latency = latency
+        self.tps = tps
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                request = json.loads(body or b"{}")
+                content = mock_completion(request)
+                delay = server.latency + (len(content) / 4 / server.tps if server.tps else 0.0)
+                time.sleep(delay)
+                with server.lock:
+                    server.requests += 1
+                payload = json.dumps({
+                    "id": f"mock-{server.requests}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "mock"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {"prompt_tokens": len(body) // 4, "completion_tokens": len(content) // 4,
+                              "total_tokens": (len(body) + len(content)) // 4},
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock LLM endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per request")
+    parser.add_argument("--tps", type=float, default=0.0, help="Simulated output tokens/s")
+    args = parser.parse_args()
+
+    server = MockLLMServer(args.host, args.port, args.latency, args.tps)
+    print(f"🧪 Mock LLM listening on {server.url}")
+    print(f"   export GROQ_BASE_URL={server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+OCR fallback for scanned pages.
+Pages whose text layer is empty are rendered from their embedded images
+and run through Tesseract in a process pool. Results are cached on disk
+by image hash, so re-uploads of the same scan cost nothing.
+"""
+
+import hashlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+import PyPDF2
+from pdf_backends import read_pdf_bytes
+
+try:
+    import pytesseract
+    from PIL import Image
+    OCR_AVAILABLE = True
+except ImportError:
+    OCR_AVAILABLE = False
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "ocr")
+
+
+def is_blank(text):
+    """True for pages with no usable text layer"""
+    return not text or not text.strip()
+
+
+def _ocr_image(data, lang):
+    """Runs in a worker process"""
+    image = Image.open(io.BytesIO(data))
+    return pytesseract.image_to_string(image, lang=lang)
+
+
+class OCRFallback:
+    def __init__(self, max_workers=None, cache_dir=DEFAULT_CACHE_DIR, lang="eng"):
+        if not OCR_AVAILABLE:
+            raise ImportError("OCR needs pytesseract and Pillow: pip install pytesseract pillow "
+                              "(plus the Tesseract binary)")
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        self.lang = lang
+        self.executor = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_path(self, digest):
+        return os.path.join(self.cache_dir, f"{digest}-{self.lang}.txt")
+
+    def _pool(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self.executor
+
+    def fill_missing(self, source, pages_text):
+        """
+        Return pages_text with blank pages replaced by OCR text.
+        source is the PDF (path, bytes or upload); pages_text is the
+        per-page output of the text backend.
+        """
+        blank_pages = [i for i, text in enumerate(pages_text) if is_blank(text)]
+        if not blank_pages:
+            return pages_text
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(read_pdf_bytes(source)))
+
+        # Collect every embedded image on the blank pages
+        page_images = {}
+        for page_num in blank_pages:
+            page_images[page_num] = [
+                (hashlib.sha256(image.data).hexdigest(), image.data)
+                for image in pdf_reader.pages[page_num].images
+            ]
+
+        # Cached images are read back; the rest go to the worker pool
+        results = {}
+        futures = {}
+        for images in page_images.values():
+            for digest, data in images:
+                if digest in results or digest in futures:
+                    continue
+                cache_path = self._cache_path(digest)
+                if os.path.exists(cache_path):
+                    with open(cache_path, encoding='utf-8') as f:
+                        results[digest] = f.read()
+                else:
+                    futures[digest] = self._pool().submit(_ocr_image, data, self.lang)
+
+        for digest, future in futures.items():
+            try:
+                results[digest] = future.result()
+            except Exception:
+                # Unreadable image (unsupported filter, corrupt data) - leave the page blank
+                results[digest] = ""
+                continue
+            with open(self._cache_path(digest), "w", encoding='utf-8') as f:
+                f.write(results[digest])
+
+        filled = list(pages_text)
+        for page_num, images in page_images.items():
+            filled[page_num] = "\n".join(results[digest] for digest, _ in images)
+        return filled
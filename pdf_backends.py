@@ -0,0 +1,188 @@
+"""
+Pluggable PDF text extraction backends.
+Backends are tried in the configured order; when one fails to open the
+document or to read a page, the next one is used for that page.
+Configure the order with PDF_BACKENDS, e.g. PDF_BACKENDS=pymupdf,pypdf2
+"""
+
+import io
+import os
+
+BACKEND_NAMES = ("pymupdf", "pypdf", "pypdf2", "pdfminer")
+DEFAULT_BACKENDS = os.getenv("PDF_BACKENDS", "pymupdf,pypdf,pypdf2")
+
+
+def read_pdf_bytes(source):
+    """Raw bytes from a path, bytes object or file-like upload"""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as file:
+            return file.read()
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source.read()
+
+
+class PDFBackend:
+    """Backend interface: open() a document, then read page_text() per page"""
+    name = None
+
+    def open(self, data):
+        raise NotImplementedError
+
+    def page_count(self, doc):
+        raise NotImplementedError
+
+    def page_text(self, doc, page_num):
+        raise NotImplementedError
+
+
+class PyPDF2Backend(PDFBackend):
+    name = "pypdf2"
+
+    def __init__(self):
+        import PyPDF2
+        self.module = PyPDF2
+
+    def open(self, data):
+        return self.module.PdfReader(io.BytesIO(data))
+
+    def page_count(self, doc):
+        return len(doc.pages)
+
+    def page_text(self, doc, page_num):
+        return doc.pages[page_num].extract_text()
+
+
+class PypdfBackend(PyPDF2Backend):
+    name = "pypdf"
+
+    def __init__(self):
+        import pypdf
+        self.module = pypdf
+
+
+class PdfminerBackend(PDFBackend):
+    name = "pdfminer"
+
+    def __init__(self):
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+        self.extract_pages = extract_pages
+        self.text_container = LTTextContainer
+
+    def open(self, data):
+        # pdfminer lays out the whole document in one pass
+        return [
+            "".join(element.get_text() for element in layout
+                    if isinstance(element, self.text_container))
+            for layout in self.extract_pages(io.BytesIO(data))
+        ]
+
+    def page_count(self, doc):
+        return len(doc)
+
+    def page_text(self, doc, page_num):
+        return doc[page_num]
+
+
+class PyMuPDFBackend(PDFBackend):
+    name = "pymupdf"
+
+    def __init__(self):
+        try:
+            import pymupdf
+        except ImportError:
+            # PyMuPDF < 1.24 only ships the legacy module name
+            import fitz as pymupdf
+        self.module = pymupdf
+
+    def open(self, data):
+        return self.module.open(stream=data, filetype="pdf")
+
+    def page_count(self, doc):
+        return doc.page_count
+
+    def page_text(self, doc, page_num):
+        return doc[page_num].get_text()
+
+
+BACKENDS = {
+    "pypdf2": PyPDF2Backend,
+    "pypdf": PypdfBackend,
+    "pdfminer": PdfminerBackend,
+    "pymupdf": PyMuPDFBackend,
+}
+
+
+def available_backends(names=BACKEND_NAMES):
+    """Instantiate the named backends whose libraries are installed"""
+    if isinstance(names, str):
+        names = [name.strip() for name in names.split(",") if name.strip()]
+    backends = []
+    for name in names:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown PDF backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+        try:
+            backends.append(BACKENDS[name]())
+        except ImportError:
+            continue
+    return backends
+
+
+class TextExtractor:
+    def __init__(self, backends=DEFAULT_BACKENDS):
+        """backends: list or comma-separated string of names, in preference order"""
+        self.backends = available_backends(backends)
+        if not self.backends:
+            raise ImportError(f"None of the PDF backends '{backends}' are installed")
+        self.page_backends = []
+
+    def extract_pages(self, source):
+        """Per-page text, falling back to the next backend on failure"""
+        data = read_pdf_bytes(source)
+        docs = {}
+        errors = []
+
+        def open_doc(backend):
+            # Backends are opened lazily, only once an earlier one has failed
+            if backend.name not in docs:
+                try:
+                    docs[backend.name] = backend.open(data)
+                except Exception as e:
+                    docs[backend.name] = None
+                    errors.append(f"{backend.name}: {e}")
+            return docs[backend.name]
+
+        page_count = None
+        for backend in self.backends:
+            doc = open_doc(backend)
+            if doc is not None:
+                page_count = backend.page_count(doc)
+                break
+        if page_count is None:
+            raise ValueError("Could not read PDF with any backend - " + "; ".join(errors))
+
+        pages_text = []
+        self.page_backends = []
+        for page_num in range(page_count):
+            for backend in self.backends:
+                doc = open_doc(backend)
+                if doc is None:
+                    continue
+                try:
+                    text = backend.page_text(doc, page_num)
+                except Exception:
+                    continue
+                pages_text.append(text or "")
+                self.page_backends.append(backend.name)
+                break
+            else:
+                pages_text.append("")
+                self.page_backends.append(None)
+        return pages_text
+
+    def extract_text(self, source):
+        """Whole-document text"""
+        return "".join(self.extract_pages(source))
@@ -1,34 +1,25 @@
-import PyPDF2
 import json
-import pandas as pd
-from groq import Groq
 import os
+import argparse
 from dotenv import load_dotenv
+from tiered_extraction import (TieredExtractor, LARGE_MODEL, DEFAULT_THRESHOLD, DEFAULT_TIERS,
+                               DEFAULT_CHUNK_CHARS, split_into_chunks)
+from ocr import OCRFallback, is_blank
+from pdf_backends import TextExtractor, DEFAULT_BACKENDS, read_pdf_bytes
+from checkpoint import CheckpointJournal, DEFAULT_JOURNAL_DIR
+from result_store import content_hash
+from singleflight import SingleFlight
+from structured_output import StructuredOutputClient, JSON_OBJECT_INSTRUCTION
+from client_pool import ClientPool, DEFAULT_MAX_IN_FLIGHT
+from row_index import RowIndex, DEFAULT_INDEX_PATH
+from rows import to_rows, write_excel, write_parquet
+from table_extraction import TableExtractor, table_sheets
+from batch_packing import BatchPacker, pack_documents, build_batch_prompt, DEFAULT_PACK_TOKENS
+from dry_run import estimate_document, project, print_plan
+from concurrent.futures import ThreadPoolExecutor, as_completed
 load_dotenv()
 
-class PDFToExcelExtractor:
-    def __init__(self, api_key):
-        """Initialize with API key for Groq AI service"""
-        self.client = Groq(api_key=api_key)
-        
-    def extract_text_from_pdf(self, pdf_path):
-        """Extract text from PDF file"""
-        print(f"📄 Reading PDF: {pdf_path}")
-        text = ""
-        
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page_num, page in enumerate(pdf_reader.pages):
-                text += page.extract_text()
-                print(f"   ✓ Extracted page {page_num + 1}")
-        
-        return text
-    
-    def extract_structured_data(self, pdf_text):
-        """Use Groq AI to extract structured key-value pairs"""
-        print("\n🤖 Sending to Groq AI for extraction...")
-        
-        prompt = f"""You are an expert data extraction system. Your task is to extract ALL information from the following text and structure it into key-value pairs with optional comments.
+EXTRACTION_PROMPT = """You are an expert data extraction system. Your task is to extract ALL information from the following text and structure it into key-value pairs with optional comments.
 
 CRITICAL REQUIREMENTS:
 1. Extract 100% of the content - nothing should be missed
@@ -52,8 +43,108 @@ TEXT TO EXTRACT:
 
 Return ONLY the JSON array, no additional text."""
 
+
+def build_prompt(pdf_text):
+    """The exact extraction prompt sent for a piece of document text"""
+    return EXTRACTION_PROMPT.format(pdf_text=pdf_text)
+
+
+def plan_requests(pdf_text, chunk_chars=DEFAULT_CHUNK_CHARS, json_mode=None, tiered=False):
+    """(prompt, chunk) for every request a conversion would send (worst case when tiered)"""
+    chunks = [chunk for chunk in split_into_chunks(pdf_text, chunk_chars) if chunk.strip()]
+    requests = []
+    for chunk in chunks or [pdf_text]:
+        prompt = build_prompt(chunk) + (JSON_OBJECT_INSTRUCTION if json_mode else "")
+        requests.extend([(prompt, chunk)] * (len(DEFAULT_TIERS) if tiered else 1))
+    return requests
+
+
+# Concurrent process() calls sending the same text with the same options share one AI extraction
+_inflight = SingleFlight()
+
+class PDFToExcelExtractor:
+    def __init__(self, api_key, tiered=False, tier_threshold=DEFAULT_THRESHOLD, ocr=False,
+                 pdf_backends=DEFAULT_BACKENDS, checkpoint_dir=None, chunk_chars=DEFAULT_CHUNK_CHARS,
+                 json_mode=None, index_path=None, parquet=False, tables=False):
+        """Initialize with API key for Groq AI service (plus GROQ_API_KEYS / LLM_ENDPOINTS)"""
+        self.pool = ClientPool.from_env(api_key)
+        self.client = self.pool.for_job(f"extractor-{id(self)}")
+        self.structured_output = None
+        if json_mode:
+            self.structured_output = StructuredOutputClient(self.client, mode=json_mode)
+        self.checkpoint_dir = checkpoint_dir
+        self.row_index = RowIndex(index_path) if index_path else None
+        self.parquet = parquet
+        self.chunk_chars = chunk_chars
+        self.text_extractor = TextExtractor(pdf_backends)
+        self.ocr = OCRFallback() if ocr else None
+        self.table_extractor = TableExtractor() if tables else None
+        self.tiers = None
+        if tiered:
+            self.tiers = TieredExtractor(self.extract_structured_data, threshold=tier_threshold,
+                                         chunk_chars=chunk_chars)
+        
+    def extraction_options(self):
+        """Settings that change the text sent to the AI or the rows it returns"""
+        return {
+            "backends": [backend.name for backend in self.text_extractor.backends],
+            "ocr": self.ocr is not None,
+            "tables": self.table_extractor is not None,
+            "chunk_chars": self.chunk_chars,
+            "json_mode": self.structured_output.mode if self.structured_output else None,
+            "tiers": [self.tiers.models, self.tiers.threshold] if self.tiers else None,
+        }
+    
+    def extract_text_from_pdf(self, pdf_path):
+        """Extract text from PDF file"""
+        return "".join(self.extract_pages_from_pdf(pdf_path))
+    
+    def extract_pages_from_pdf(self, pdf_path, tables=None):
+        """
+        Extract per-page text from PDF file. With table extraction on and a
+        tables list given, detected tables are appended to it and their
+        lines are left out of the returned text.
+        """
+        print(f"📄 Reading PDF: {pdf_path}")
+        pages_text = self.text_extractor.extract_pages(pdf_path)
+        
+        for page_num, (text, backend) in enumerate(zip(pages_text, self.text_extractor.page_backends)):
+            if is_blank(text):
+                print(f"   ⚠️  Page {page_num + 1} has no text layer (scanned?)")
+            else:
+                print(f"   ✓ Extracted page {page_num + 1} ({backend})")
+        
+        blank_pages = sum(1 for text in pages_text if is_blank(text))
+        if blank_pages and self.ocr:
+            print(f"   🔍 Running OCR on {blank_pages} scanned page(s)...")
+            pages_text = self.ocr.fill_missing(pdf_path, pages_text)
+        
+        if self.table_extractor and tables is not None:
+            found, page_texts = self.table_extractor.extract(pdf_path, pages_text)
+            for page_num, text in page_texts.items():
+                pages_text[page_num] = text
+            tables.extend(found)
+            if found:
+                print(f"   📐 Extracted {len(found)} table(s) locally - left out of the AI prompt")
+        
+        return pages_text
+    
+    def extract_structured_data(self, pdf_text, model=LARGE_MODEL):
+        """Use Groq AI to extract structured key-value pairs"""
+        if is_blank(pdf_text):
+            raise ValueError("No readable text in PDF - it looks scanned, rerun with --ocr")
+        
+        print(f"\n🤖 Sending to Groq AI for extraction ({model})...")
+        
+        prompt = build_prompt(pdf_text)
+
+        if self.structured_output:
+            data = self.structured_output.extract_rows(model, prompt, pdf_text)
+            print(f"   ✓ Extracted {len(data)} key-value pairs (schema-validated)")
+            return data
+
         response = self.client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+            model=model,
             messages=[
                 {"role": "user", "content": prompt}
             ],
@@ -74,7 +165,7 @@ Return ONLY the JSON array, no additional text."""
         print("   ✓ Received structured data from AI")
         
         try:
-            data = json.loads(response_text)
+            data = to_rows(json.loads(response_text))
             print(f"   ✓ Extracted {len(data)} key-value pairs")
             return data
         except json.JSONDecodeError as e:
@@ -82,75 +173,313 @@ Return ONLY the JSON array, no additional text."""
             print(f"   Response: {response_text[:500]}")
             raise
     
-    def create_excel(self, structured_data, output_path):
-        """Create Excel file from structured data"""
-        print(f"\n📊 Creating Excel file: {output_path}")
+    def extract_chunks(self, pdf_text, journal=None):
+        """Run the AI stage chunk by chunk, skipping chunks already in the journal"""
+        chunks = [chunk for chunk in split_into_chunks(pdf_text, self.chunk_chars) if chunk.strip()]
+        chunks = chunks or [pdf_text]
         
-        # Create DataFrame
-        df = pd.DataFrame(structured_data)
+        results = {}
+        pending = []
+        for index, chunk in enumerate(chunks):
+            rows = journal.completed_rows(index, chunk) if journal else None
+            if rows is not None:
+                print(f"   ♻️  Chunk {index + 1}/{len(chunks)} restored from checkpoint")
+                results[index] = rows
+            else:
+                pending.append(index)
         
-        # Add row numbers (starting from 1)
-        df.insert(0, '#', range(1, len(df) + 1))
+        extract = self.tiers.extract_chunk if self.tiers else self.extract_structured_data
         
-        # Rename columns to match expected format
-        df.columns = ['#', 'Key', 'Value', 'Comments']
+        # Chunks run concurrently, up to what the client pool can serve at once
+        workers = max(1, min(self.pool.capacity, len(pending)))
+        error = None
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(extract, chunks[index]): index for index in pending}
+            # Journal each chunk as soon as it finishes, not behind slower earlier ones
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                if journal:
+                    journal.record_chunk(index, chunks[index], results[index])
+        if error:
+            raise error
         
-        # Create Excel writer
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Output', index=False)
-            
-            # Get the worksheet
-            worksheet = writer.sheets['Output']
-            
-            # Adjust column widths
-            worksheet.column_dimensions['A'].width = 5
-            worksheet.column_dimensions['B'].width = 40
-            worksheet.column_dimensions['C'].width = 35
-            worksheet.column_dimensions['D'].width = 80
-            
-        print(f"   ✓ Excel file created with {len(df)} rows")
+        structured_data = []
+        for index in range(len(chunks)):
+            structured_data.extend(results[index])
+        return structured_data
+    
+    def create_excel(self, structured_data, output_path, tables=()):
+        """Create Excel file from structured data (plus a sheet per extracted table)"""
+        print(f"\n📊 Creating Excel file: {output_path}")
+        
+        # Columns are mapped by name from the row records (see rows.COLUMN_MAP)
+        count = write_excel(structured_data, output_path, sheets=table_sheets(tables))
+        
+        print(f"   ✓ Excel file created with {count} rows")
+        if tables:
+            print(f"   ✓ Plus {len(tables)} table sheet(s)")
         print(f"   ✓ Saved to: {output_path}")
         
-    def process(self, pdf_path, output_path):
-        """Main processing pipeline"""
+    def process(self, pdf_path, output_path, pages_text=None, tables=None):
+        """Main processing pipeline; pass pages_text (and tables) when the PDF was already parsed"""
         print("=" * 60)
         print("🚀 PDF TO EXCEL EXTRACTION STARTED")
         print("=" * 60)
         
-        # Step 1: Extract text from PDF
-        pdf_text = self.extract_text_from_pdf(pdf_path)
+        digest = content_hash(read_pdf_bytes(pdf_path))
+        journal = None
+        if self.checkpoint_dir:
+            journal = CheckpointJournal.for_document(digest, self.checkpoint_dir,
+                                                     options=self.extraction_options())
+        parsed = pages_text is not None
+        if tables is None:
+            tables = []
         
-        # Step 2: Extract structured data using AI
-        structured_data = self.extract_structured_data(pdf_text)
-        
-        # Step 3: Create Excel file
-        self.create_excel(structured_data, output_path)
+        try:
+            # Step 1: Extract text from PDF (or replay it from the checkpoint)
+            if journal and journal.resumed:
+                print(f"♻️  Resuming from checkpoint: {journal.path}")
+                pages_text = journal.pages
+                if self.table_extractor and not parsed:
+                    tables = self.table_extractor.extract(pdf_path)[0]
+            else:
+                if not parsed:
+                    pages_text = self.extract_pages_from_pdf(pdf_path, tables)
+                if journal:
+                    journal.record_pages(pages_text)
+            pdf_text = "".join(pages_text)
+            
+            # Step 2: Extract structured data using AI
+            if self.tiers:
+                self.tiers.reset_stats()
+            # Same text sent with the same options -> one AI extraction
+            options = self.extraction_options()
+            key = (content_hash(pdf_text.encode('utf-8')), options["chunk_chars"], options["json_mode"],
+                   (tuple(self.tiers.models), self.tiers.threshold) if self.tiers else None)
+            structured_data = _inflight.do(key, self.extract_chunks, pdf_text, journal)
+            if self.tiers:
+                self.tiers.print_report()
+            
+            # Step 3: Create Excel file (and add its rows to the cross-document index)
+            self._write_output(pdf_path, structured_data, output_path, tables)
+            if journal:
+                journal.commit()
+        finally:
+            if journal:
+                journal.close()
         
         print("\n" + "=" * 60)
         print("✅ EXTRACTION COMPLETE!")
         print("=" * 60)
         
         return structured_data
+    
+    def process_packed(self, pdf_paths, output_dir, pack_tokens=DEFAULT_PACK_TOKENS):
+        """Convert several PDFs, packing small ones into shared requests"""
+        # The same file listed twice is converted once
+        pdf_paths = list(dict.fromkeys(pdf_paths))
+        print("=" * 60)
+        print(f"🚀 PACKED EXTRACTION OF {len(pdf_paths)} DOCUMENTS")
+        print("=" * 60)
+        
+        os.makedirs(output_dir, exist_ok=True)
+        outputs = {}
+        for pdf_path in pdf_paths:
+            stem = os.path.splitext(os.path.basename(pdf_path))[0] or "output"
+            name, counter = stem, 2
+            while name in outputs.values():
+                name, counter = f"{stem}_{counter}", counter + 1
+            outputs[pdf_path] = name
+        
+        failed = []
+        pages, tables, docs = {}, {}, []
+        for pdf_path in pdf_paths:
+            tables[pdf_path] = []
+            try:
+                pages[pdf_path] = self.extract_pages_from_pdf(pdf_path, tables[pdf_path])
+            except Exception as e:
+                print(f"❌ {pdf_path}: {e}")
+                failed.append(pdf_path)
+                continue
+            docs.append((pdf_path, "".join(pages[pdf_path])))
+        batches, singles = pack_documents(docs, pack_tokens)
+        print(f"\n📦 {sum(len(batch) for batch in batches)} small documents packed into "
+              f"{len(batches)} request(s), {len(singles)} sent individually")
+        
+        packer = BatchPacker(self.client)
+        workers = max(1, min(self.pool.capacity, len(batches)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [(batch, executor.submit(packer.extract_batch, batch, LARGE_MODEL))
+                       for batch in batches]
+            for batch, future in futures:
+                try:
+                    answered = future.result()
+                except Exception as e:
+                    print(f"   ⚠️  Packed request failed ({e}) - sending its documents individually")
+                    answered = {}
+                for pdf_path, text in batch:
+                    if pdf_path in answered:
+                        print(f"   ✓ {pdf_path}: {len(answered[pdf_path])} key-value pairs (packed)")
+                        try:
+                            self._write_output(pdf_path, answered[pdf_path],
+                                               os.path.join(output_dir, outputs[pdf_path] + ".xlsx"),
+                                               tables[pdf_path])
+                        except Exception as e:
+                            print(f"❌ {pdf_path}: {e}")
+                            failed.append(pdf_path)
+                    else:
+                        singles.append((pdf_path, text))
+        
+        for pdf_path, _ in singles:
+            try:
+                self.process(pdf_path, os.path.join(output_dir, outputs[pdf_path] + ".xlsx"),
+                             pages[pdf_path], tables[pdf_path])
+            except Exception as e:
+                print(f"❌ {pdf_path}: {e}")
+                failed.append(pdf_path)
+        
+        print("\n" + "=" * 60)
+        print(f"✅ {len(pdf_paths) - len(failed)} of {len(pdf_paths)} documents converted "
+              f"({packer.requests} packed request(s))")
+        print("=" * 60)
+        return failed
+    
+    def _write_output(self, pdf_path, structured_data, output_path, tables=()):
+        """Excel file plus row index entry for one finished document"""
+        self.create_excel(structured_data, output_path, tables)
+        if self.parquet:
+            parquet_path = os.path.splitext(output_path)[0] + ".parquet"
+            write_parquet(structured_data, parquet_path)
+            print(f"   ✓ Parquet copy saved to: {parquet_path}")
+        if self.row_index:
+            count = self.row_index.add_document(os.path.abspath(output_path), structured_data,
+                                                source_pdf=os.path.abspath(pdf_path))
+            print(f"   ✓ Indexed {count} rows in {self.row_index.path}")
+
+
+def dry_run(pdf_paths, args, api_key=None):
+    """Parse the PDFs and estimate what converting them would cost - no API calls"""
+    text_extractor = TextExtractor(args.pdf_backends)
+    ocr = OCRFallback() if args.ocr else None
+    table_extractor = TableExtractor() if args.tables else None
+    docs = []
+    for pdf_path in dict.fromkeys(pdf_paths):
+        try:
+            pages_text = text_extractor.extract_pages(pdf_path)
+            if ocr and any(is_blank(text) for text in pages_text):
+                pages_text = ocr.fill_missing(pdf_path, pages_text)
+            if table_extractor:
+                for page_num, text in table_extractor.extract(pdf_path, pages_text)[1].items():
+                    pages_text[page_num] = text
+        except FileNotFoundError:
+            print(f"❌ Error: {pdf_path} not found!")
+            continue
+        except Exception as e:
+            print(f"❌ {pdf_path}: could not parse ({e}) - skipped")
+            continue
+        pdf_text = "".join(pages_text)
+        if is_blank(pdf_text):
+            print(f"   ⚠️  {pdf_path}: no readable text (scanned?) - it would fail without --ocr")
+            continue
+        docs.append((pdf_path, pdf_text))
+    
+    estimates = []
+    if args.pack:
+        # Same grouping as process_packed: one request per packed batch
+        batches, docs = pack_documents(docs, args.pack_tokens)
+        for batch in batches:
+            text = "".join(text for _, text in batch)
+            estimates.append(estimate_document(f"packed: {', '.join(name for name, _ in batch)}",
+                                               [(build_batch_prompt(batch), text)]))
+    for pdf_path, pdf_text in docs:
+        requests = plan_requests(pdf_text, args.chunk_chars, args.json_mode, args.tiered)
+        estimates.append(estimate_document(pdf_path, requests))
+    
+    keys, specs = ClientPool.configured(api_key)
+    endpoints = len(keys) + len(specs)
+    totals = project(estimates, endpoints=endpoints, concurrency=DEFAULT_MAX_IN_FLIGHT)
+    print_plan(estimates, totals, endpoints=max(1, endpoints))
+    if args.tiered:
+        print("   (tiered: assumes every chunk escalates to the large model)")
+    return totals
 
 
 def main():
     """Main execution function"""
     
+    parser = argparse.ArgumentParser(description="Convert a PDF into a Key/Value/Comments Excel sheet")
+    parser.add_argument("input_pdf", nargs="?", default="Sample_Data_Input.pdf")
+    parser.add_argument("output_excel", nargs="?", default="Output.xlsx")
+    parser.add_argument("--tiered", action="store_true",
+                        help="Try a small model first and escalate weak chunks to the large one")
+    parser.add_argument("--tier-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Minimum DataEvaluator score a chunk needs to skip escalation")
+    parser.add_argument("--ocr", action="store_true",
+                        help="OCR pages without a text layer (needs pytesseract + Tesseract)")
+    parser.add_argument("--tables", action="store_true",
+                        help="Detect tables from the PDF layout, write them to extra sheets "
+                             "and leave them out of the AI prompt (needs pymupdf or pdfminer.six)")
+    parser.add_argument("--pdf-backends", default=DEFAULT_BACKENDS,
+                        help="Comma-separated text backends in fallback order "
+                             "(pymupdf, pypdf, pypdf2, pdfminer)")
+    parser.add_argument("--json-mode", choices=["json_object", "json_schema"],
+                        help="Request JSON-mode output, validate each row and re-request "
+                             "only a truncated tail instead of failing")
+    parser.add_argument("--pack", nargs="+", metavar="PDF",
+                        help="Convert several PDFs into --output-dir, sending small ones "
+                             "several per request")
+    parser.add_argument("--output-dir", default="outputs", help="Where --pack writes workbooks")
+    parser.add_argument("--pack-tokens", type=int, default=DEFAULT_PACK_TOKENS,
+                        help="Document text (in tokens) packed into one request")
+    parser.add_argument("--parquet", action="store_true",
+                        help="Also write the rows next to the workbook as .parquet (needs pyarrow)")
+    parser.add_argument("--chunk-chars", type=int, default=DEFAULT_CHUNK_CHARS,
+                        help="Document text per LLM request")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Parse the PDFs and estimate requests, tokens, time and cost "
+                             "without calling the API")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH,
+                        help="Cross-document row index to add the output to (query with row_index.py)")
+    parser.add_argument("--no-index", action="store_true", help="Don't index the output rows")
+    parser.add_argument("--checkpoint-dir", default=DEFAULT_JOURNAL_DIR,
+                        help="Where per-document checkpoint journals are kept")
+    parser.add_argument("--no-checkpoint", action="store_true",
+                        help="Don't journal progress (interrupted runs start over)")
+    args = parser.parse_args()
+    
     # Configuration
     API_KEY = os.getenv("GROQ_API_KEY")  # Set this as environment variable
     # OR hardcode for testing: API_KEY = "your-api-key-here"
     
+    if args.dry_run:
+        dry_run(args.pack or [args.input_pdf], args, API_KEY)
+        return
+    
     if not API_KEY:
         print("❌ ERROR: GROQ_API_KEY not found!")
         print("Set it as environment variable or hardcode in the script")
         return
     
-    # INPUT_PDF = "Data Input.pdf"   
-    INPUT_PDF = "Sample_Data_Input.pdf"   
-    OUTPUT_EXCEL = "Output.xlsx"
+    INPUT_PDF = args.input_pdf
+    OUTPUT_EXCEL = args.output_excel
     
     # Create extractor instance
-    extractor = PDFToExcelExtractor(api_key=API_KEY)
+    extractor = PDFToExcelExtractor(api_key=API_KEY, tiered=args.tiered,
+                                    tier_threshold=args.tier_threshold, ocr=args.ocr,
+                                    pdf_backends=args.pdf_backends,
+                                    checkpoint_dir=None if args.no_checkpoint else args.checkpoint_dir,
+                                    json_mode=args.json_mode, chunk_chars=args.chunk_chars,
+                                    index_path=None if args.no_index else args.index,
+                                    parquet=args.parquet, tables=args.tables)
+    
+    if args.pack:
+        extractor.process_packed(args.pack, args.output_dir, args.pack_tokens)
+        return
     
     # Process the PDF
     try:
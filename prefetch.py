@@ -0,0 +1,95 @@
+"""
+Speculative background parsing of uploaded PDFs.
+Parsing starts as soon as a file is uploaded, so by the time the user
+clicks Start the text, chunks and stats are usually ready and only the
+LLM stage is left on the critical path. Results are kept in a small
+LRU cache keyed by content hash (and the parse options).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from ocr import is_blank
+from pdf_backends import TextExtractor, DEFAULT_BACKENDS
+from table_extraction import TableExtractor
+from tiered_extraction import DEFAULT_CHUNK_CHARS, split_into_chunks
+from dry_run import count_tokens
+
+
+class PreparedDocument:
+    """Parsed text of one PDF, ready for the LLM stage"""
+
+    def __init__(self, pages_text, backends=(), seconds=0.0, chunk_chars=DEFAULT_CHUNK_CHARS,
+                 tables=()):
+        self.pages_text = pages_text
+        self.tables = list(tables)
+        self.text = "".join(pages_text)
+        self.chunks = [chunk for chunk in split_into_chunks(self.text, chunk_chars) if chunk.strip()]
+        self.backends = sorted(set(backends))
+        self.seconds = seconds
+        self.estimates = {}
+
+    def stats(self):
+        return {
+            "pages": len(self.pages_text),
+            "blank_pages": sum(1 for text in self.pages_text if is_blank(text)),
+            "characters": len(self.text),
+            "words": len(self.text.split()),
+            "tokens": count_tokens(self.text),
+            "chunks": len(self.chunks),
+            "tables": len(self.tables),
+            "seconds": self.seconds,
+            "backends": ", ".join(self.backends),
+        }
+
+
+def prepare_document(data, ocr=None, tables=False, pdf_backends=DEFAULT_BACKENDS,
+                     chunk_chars=DEFAULT_CHUNK_CHARS):
+    """
+    Parse raw PDF bytes into a PreparedDocument, OCR-ing scanned pages when
+    ocr is given and pulling tables out of the text when tables is set.
+    The extractors are built here, so a cached parse costs nothing.
+    """
+    start = time.perf_counter()
+    text_extractor = TextExtractor(pdf_backends)
+    pages_text = text_extractor.extract_pages(data)
+    backends = list(text_extractor.page_backends)
+    if ocr and any(is_blank(text) for text in pages_text):
+        pages_text = ocr.fill_missing(data, pages_text)
+    found = []
+    if tables:
+        found, page_texts = TableExtractor().extract(data, pages_text)
+        for page_num, text in page_texts.items():
+            pages_text[page_num] = text
+    return PreparedDocument(pages_text, backends, time.perf_counter() - start, chunk_chars, found)
+
+
+class ParsePrefetcher:
+    def __init__(self, max_workers=2, max_entries=32):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-parse")
+        self.max_entries = max_entries
+        self.futures = OrderedDict()
+        self.lock = threading.Lock()
+
+    def submit(self, key, fn, *args, **kwargs):
+        """
+        Start fn(*args, **kwargs) in the background unless key is already
+        parsed or parsing. Failed parses stay cached too, so a corrupt upload
+        isn't re-parsed on every refresh.
+        """
+        with self.lock:
+            future = self.futures.get(key)
+            if future is not None:
+                self.futures.move_to_end(key)
+                return future
+            future = self.executor.submit(fn, *args, **kwargs)
+            self.futures[key] = future
+            while len(self.futures) > self.max_entries:
+                self.futures.popitem(last=False)
+            return future
+
+    def get(self, key):
+        """Future for key, or None if it was never submitted (or was evicted)"""
+        with self.lock:
+            return self.futures.get(key)
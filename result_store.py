@@ -0,0 +1,125 @@
+"""
+Process-wide conversion result store, keyed by PDF content hash (plus the
+conversion options).
+Backed by SQLite with least-recently-used eviction once the stored
+results exceed a size limit.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import pandas as pd
+
+DEFAULT_STORE_PATH = os.getenv("RESULT_STORE_PATH", os.path.join(".cache", "results.sqlite3"))
+DEFAULT_MAX_BYTES = int(os.getenv("RESULT_STORE_MAX_MB", "256")) * 1024 * 1024
+
+
+def content_hash(data):
+    """SHA-256 of the raw PDF bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _frame_to_json(df):
+    cells = df.astype(object).where(df.notna(), None).values.tolist()
+    return json.dumps({"columns": list(df.columns), "data": cells}, default=str)
+
+
+def _frame_from_json(text):
+    payload = json.loads(text)
+    return pd.DataFrame(payload["data"], columns=payload["columns"])
+
+
+class ResultStore:
+    def __init__(self, path=DEFAULT_STORE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                hash TEXT PRIMARY KEY,
+                filename TEXT,
+                created REAL,
+                last_access REAL,
+                size INTEGER,
+                frame TEXT,
+                metrics TEXT,
+                excel BLOB
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, digest):
+        """Stored result for a content hash, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT filename, created, frame, metrics, excel FROM results WHERE hash = ?",
+                (digest,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE results SET last_access = ? WHERE hash = ?",
+                              (time.time(), digest))
+            self.conn.commit()
+
+        filename, created, frame, metrics, excel = row
+        return {
+            "hash": digest,
+            "filename": filename,
+            "created": created,
+            "df": _frame_from_json(frame),
+            "metrics": json.loads(metrics),
+            "excel": excel,
+        }
+
+    def get_excel(self, digest):
+        """Just the .xlsx bytes, without counting as an access"""
+        with self.lock:
+            row = self.conn.execute("SELECT excel FROM results WHERE hash = ?",
+                                    (digest,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, digest, filename, df, metrics, excel):
+        """Store a finished conversion and evict old ones if over budget"""
+        frame = _frame_to_json(df)
+        metrics = json.dumps(metrics)
+        size = len(frame) + len(metrics) + len(excel)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (digest, filename, now, now, size, frame, metrics, excel)
+            )
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        """Drop least recently used results until under max_bytes"""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for digest, size in self.conn.execute(
+                "SELECT hash, size FROM results ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM results WHERE hash = ?", (digest,))
+            total -= size
+
+    def recent(self, limit=10):
+        """Most recent conversions, newest first"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT hash, filename, created, metrics FROM results "
+                "ORDER BY created DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [
+            {"hash": digest, "filename": filename, "created": created,
+             "score": json.loads(metrics).get("score")}
+            for digest, filename, created, metrics in rows
+        ]
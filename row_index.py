@@ -0,0 +1,239 @@
+"""
+Cross-document index over extracted Key/Value/Comments rows.
+Every converted document's rows go into a persistent SQLite FTS5 index,
+with a normalized-key dictionary and parsed numeric values, so lookups
+like "all rows mentioning a certification" or "Current Salary > X"
+across thousands of outputs take milliseconds and need no re-parsing.
+
+Usage:
+    python row_index.py add Output.xlsx other.xlsx
+    python row_index.py search "certification"
+    python row_index.py key "Current Salary" --gt 1000000
+    python row_index.py keys --prefix sal
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+import pandas as pd
+from rows import frame_to_rows
+
+DEFAULT_INDEX_PATH = os.getenv("ROW_INDEX_PATH", os.path.join(".cache", "row_index.sqlite3"))
+
+_NUMBER = re.compile(r'-?\d[\d,]*(?:\.\d+)?')
+
+
+def normalize_key(key):
+    """'Current  Salary (CTC):' -> 'current salary ctc'"""
+    return " ".join(re.findall(r'[a-z0-9]+', str(key).lower()))
+
+
+def parse_number(value):
+    """First number in a value ('₹ 3,50,000 p.a.' -> 350000.0), or None"""
+    match = _NUMBER.search(str(value))
+    if not match:
+        return None
+    try:
+        return float(match.group().replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _cell(value):
+    return "" if value is None or (isinstance(value, float) and pd.isna(value)) else str(value)
+
+
+class RowIndex:
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE,
+                source_pdf TEXT,
+                indexed_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS rows (
+                row_id INTEGER PRIMARY KEY,
+                doc_id INTEGER REFERENCES documents(doc_id),
+                row_num INTEGER,
+                key TEXT,
+                norm_key TEXT,
+                value TEXT,
+                comments TEXT,
+                number REAL
+            );
+            CREATE INDEX IF NOT EXISTS rows_norm_key ON rows(norm_key, number);
+            CREATE INDEX IF NOT EXISTS rows_doc ON rows(doc_id);
+            CREATE TABLE IF NOT EXISTS keys (
+                norm_key TEXT PRIMARY KEY,
+                display_key TEXT,
+                row_count INTEGER
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS rows_fts USING fts5(
+                key, value, comments, content='rows', content_rowid='row_id'
+            );
+        """)
+        self.conn.commit()
+
+    def add_document(self, path, rows, source_pdf=None):
+        """(Re)index one output's rows (rows.Row records)"""
+        records = [(_cell(row.key), _cell(row.value), _cell(row.comments)) for row in rows]
+        with self.lock, self.conn:
+            self._remove(path)
+            doc_id = self.conn.execute(
+                "INSERT INTO documents (path, source_pdf, indexed_at) VALUES (?, ?, ?)",
+                (path, source_pdf, time.time())
+            ).lastrowid
+            for row_num, (key, value, comments) in enumerate(records, start=1):
+                norm_key = normalize_key(key)
+                row_id = self.conn.execute(
+                    "INSERT INTO rows (doc_id, row_num, key, norm_key, value, comments, number) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (doc_id, row_num, key, norm_key, value, comments, parse_number(value))
+                ).lastrowid
+                self.conn.execute(
+                    "INSERT INTO rows_fts (rowid, key, value, comments) VALUES (?, ?, ?, ?)",
+                    (row_id, key, value, comments)
+                )
+                self.conn.execute(
+                    "INSERT INTO keys (norm_key, display_key, row_count) VALUES (?, ?, 1) "
+                    "ON CONFLICT(norm_key) DO UPDATE SET row_count = row_count + 1",
+                    (norm_key, key)
+                )
+        return len(records)
+
+    def _remove(self, path):
+        """Drop a previously indexed version of a document"""
+        row = self.conn.execute("SELECT doc_id FROM documents WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return
+        doc_id = row[0]
+        old_rows = self.conn.execute(
+            "SELECT row_id, key, value, comments, norm_key FROM rows WHERE doc_id = ?", (doc_id,)
+        ).fetchall()
+        for row_id, key, value, comments, norm_key in old_rows:
+            self.conn.execute(
+                "INSERT INTO rows_fts (rows_fts, rowid, key, value, comments) "
+                "VALUES ('delete', ?, ?, ?, ?)", (row_id, key, value, comments)
+            )
+            self.conn.execute("UPDATE keys SET row_count = row_count - 1 WHERE norm_key = ?",
+                              (norm_key,))
+        self.conn.execute("DELETE FROM keys WHERE row_count <= 0")
+        self.conn.execute("DELETE FROM rows WHERE doc_id = ?", (doc_id,))
+        self.conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+
+    def add_excel(self, excel_path):
+        """Index an existing output workbook (Output sheet)"""
+        df = pd.read_excel(excel_path, sheet_name='Output')
+        return self.add_document(excel_path, frame_to_rows(df))
+
+    def _results(self, sql, params):
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [
+            {"Document": path, "#": row_num, "Key": key, "Value": value, "Comments": comments}
+            for path, row_num, key, value, comments in rows
+        ]
+
+    def search(self, query, limit=50):
+        """Full-text search over keys, values and comments"""
+        sql = ("SELECT d.path, r.row_num, r.key, r.value, r.comments "
+               "FROM rows_fts JOIN rows r ON r.row_id = rows_fts.rowid "
+               "JOIN documents d ON d.doc_id = r.doc_id "
+               "WHERE rows_fts MATCH ? ORDER BY rank LIMIT ?")
+        try:
+            return self._results(sql, (query, limit))
+        except sqlite3.OperationalError:
+            # Not valid FTS syntax - search for the words literally
+            quoted = " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+            return self._results(sql, (quoted, limit))
+
+    def lookup_key(self, key, gt=None, lt=None, eq=None, limit=1000):
+        """Rows whose normalized key matches, optionally filtered numerically"""
+        sql = ("SELECT d.path, r.row_num, r.key, r.value, r.comments "
+               "FROM rows r JOIN documents d ON d.doc_id = r.doc_id WHERE r.norm_key = ?")
+        params = [normalize_key(key)]
+        for op, bound in ((">", gt), ("<", lt), ("=", eq)):
+            if bound is not None:
+                sql += f" AND r.number {op} ?"
+                params.append(bound)
+        sql += " ORDER BY d.path, r.row_num LIMIT ?"
+        params.append(limit)
+        return self._results(sql, params)
+
+    def keys(self, prefix="", limit=100):
+        """Normalized-key dictionary, most common first"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT norm_key, display_key, row_count FROM keys WHERE norm_key LIKE ? "
+                "ORDER BY row_count DESC LIMIT ?",
+                (normalize_key(prefix) + "%", limit)
+            ).fetchall()
+        return [{"Key": display, "Normalized": norm, "Rows": count} for norm, display, count in rows]
+
+    def stats(self):
+        with self.lock:
+            documents = self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            rows = self.conn.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+        return {"documents": documents, "rows": rows}
+
+
+def _print_table(results):
+    if not results:
+        print("   (no matches)")
+        return
+    print(pd.DataFrame(results).to_string(index=False, max_colwidth=60))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the cross-document row index")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="Index database path")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="Index existing output workbooks")
+    add.add_argument("excel_files", nargs="+")
+
+    search = commands.add_parser("search", help="Full-text search over all rows")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=50)
+
+    key = commands.add_parser("key", help="Rows for a key, with optional numeric filters")
+    key.add_argument("key")
+    key.add_argument("--gt", type=float)
+    key.add_argument("--lt", type=float)
+    key.add_argument("--eq", type=float)
+
+    keys = commands.add_parser("keys", help="List the normalized key dictionary")
+    keys.add_argument("--prefix", default="")
+
+    args = parser.parse_args()
+    index = RowIndex(args.index)
+
+    start = time.perf_counter()
+    if args.command == "add":
+        for excel_file in args.excel_files:
+            print(f"   ✓ {excel_file}: {index.add_excel(excel_file)} rows indexed")
+    elif args.command == "search":
+        _print_table(index.search(args.query, args.limit))
+    elif args.command == "key":
+        _print_table(index.lookup_key(args.key, gt=args.gt, lt=args.lt, eq=args.eq))
+    elif args.command == "keys":
+        _print_table(index.keys(args.prefix))
+    elapsed = (time.perf_counter() - start) * 1000
+
+    stats = index.stats()
+    print(f"\n🔎 {stats['documents']} documents, {stats['rows']} rows indexed "
+          f"({elapsed:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Compact row records used from the LLM response through to every sink.
+A Row holds one Key/Value/Comments triple in __slots__ (no per-row dict),
+keys are interned so repeated field names share one string, and the
+mapping to output columns is explicit instead of positional, so an extra
+or reordered field from the model can't shift values into the wrong column.
+"""
+
+import sys
+import pandas as pd
+
+# Output column <- Row attribute
+COLUMN_MAP = (('Key', 'key'), ('Value', 'value'), ('Comments', 'comments'))
+COLUMNS = ('#',) + tuple(column for column, _ in COLUMN_MAP)
+
+
+class Row:
+    __slots__ = ('key', 'value', 'comments')
+
+    def __init__(self, key, value="", comments=""):
+        self.key = sys.intern(key) if isinstance(key, str) else key
+        self.value = value
+        self.comments = comments
+
+    @classmethod
+    def from_obj(cls, obj):
+        """Row from a model/JSON object, matching field names case-insensitively"""
+        if isinstance(obj, Row):
+            return obj
+        if not isinstance(obj, dict):
+            return None
+        fields = {str(name).strip().lower(): value for name, value in obj.items()}
+        key = fields.get('key')
+        if key is None:
+            return None
+        value = fields.get('value')
+        comments = fields.get('comments', fields.get('comment'))
+        return cls(key, "" if value is None else value, "" if comments is None else comments)
+
+    def as_dict(self):
+        return {'key': self.key, 'value': self.value, 'comments': self.comments}
+
+    def __eq__(self, other):
+        return isinstance(other, Row) and (
+            (self.key, self.value, self.comments) == (other.key, other.value, other.comments))
+
+    def __repr__(self):
+        return f"Row({self.key!r}, {self.value!r}, {self.comments!r})"
+
+
+def to_rows(data):
+    """Rows from a parsed response (list of objects); unusable entries are dropped"""
+    if isinstance(data, dict):
+        data = data.get('rows', [])
+    rows = []
+    for obj in data:
+        row = Row.from_obj(obj)
+        if row is not None:
+            rows.append(row)
+    return rows
+
+
+def rows_to_dicts(rows):
+    """JSON-serializable form, for the checkpoint journal"""
+    return [row.as_dict() for row in rows]
+
+
+def rows_to_frame(rows):
+    """The '#', 'Key', 'Value', 'Comments' frame, built column by column"""
+    columns = {'#': range(1, len(rows) + 1)}
+    for column, attr in COLUMN_MAP:
+        # Empty columns would default to float64, which breaks string ops downstream
+        columns[column] = pd.Series([getattr(row, attr) for row in rows], dtype=object)
+    return pd.DataFrame(columns, columns=list(COLUMNS))
+
+
+def frame_to_rows(df):
+    """Rows back from an Output frame/sheet"""
+    return [Row(*values) for values in zip(*(df[column] for column, _ in COLUMN_MAP))]
+
+
+def write_excel(rows, target, sheet_name='Output', sheets=()):
+    """
+    Write rows to an Excel file or buffer, plus any extra (name, DataFrame)
+    sheets such as extracted tables; returns the row count
+    """
+    df = rows_to_frame(rows)
+    with pd.ExcelWriter(target, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+        worksheet = writer.sheets[sheet_name]
+        worksheet.column_dimensions['A'].width = 5
+        worksheet.column_dimensions['B'].width = 40
+        worksheet.column_dimensions['C'].width = 35
+        worksheet.column_dimensions['D'].width = 80
+
+        for name, frame in sheets:
+            frame.to_excel(writer, sheet_name=name, index=False)
+    return len(df)
+
+
+def write_parquet(rows, path):
+    """Write rows to Parquet (needs pyarrow); values are stored as text"""
+    df = rows_to_frame(rows)
+    for column, _ in COLUMN_MAP:
+        df[column] = df[column].map(str)
+    df.to_parquet(path, index=False)
+    return len(df)
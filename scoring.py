@@ -0,0 +1,81 @@
+"""
+Shared scoring core for DataEvaluator and StandaloneEvaluator.
+All per-row features are computed in one vectorized pass over the
+Key/Value/Comments columns; the evaluators only aggregate them.
+"""
+
+import re
+
+# DataEvaluator (app) key vocabulary
+APP_KEY_PATTERNS = [
+    'name', 'date', 'birth', 'age', 'salary', 'education',
+    'certification', 'skill', 'organization', 'designation'
+]
+
+# StandaloneEvaluator (report) key vocabulary
+REPORT_KEY_PATTERNS = [
+    'name', 'date', 'birth', 'age', 'salary', 'organization',
+    'designation', 'role', 'education', 'degree', 'college',
+    'certification', 'skill', 'proficiency', 'school', 'year',
+    'joining', 'current', 'previous', 'score', 'grade'
+]
+
+
+def compile_key_patterns(patterns):
+    """One regex alternation instead of a substring test per pattern"""
+    return re.compile("|".join(re.escape(pattern) for pattern in patterns))
+
+
+class RowScores:
+    def __init__(self, df, key_patterns):
+        """Compute per-row features and their totals for a Key/Value/Comments frame"""
+        self.df = df
+        self.key_pattern = compile_key_patterns(key_patterns)
+        self.features = self._compute_features()
+        self.summary = self._summarize()
+
+    def _compute_features(self):
+        df = self.df
+        # str() per cell, matching the original checks ('nan' for missing cells)
+        keys = df['Key'].map(str)
+        values = df['Value'].map(str)
+        comments = df['Comments']
+
+        features = df[[]].copy()
+        features['key_null'] = df['Key'].isna()
+        features['key_meaningful'] = keys.str.lower().str.contains(self.key_pattern)
+        features['key_title_case'] = keys.str[:1].str.isupper()
+        features['key_length'] = keys.str.len()
+        features['key_duplicate'] = df.duplicated(subset=['Key'], keep=False)
+        features['value_null'] = df['Value'].isna()
+        features['value_empty'] = features['value_null'] | values.str.strip().eq('')
+        features['value_length'] = values.str.len()
+        features['comment_present'] = comments.notna() & (comments != '')
+        self._values = values
+        return features
+
+    def _summarize(self):
+        features = self.features
+        rows = len(features)
+        return {
+            'rows': rows,
+            'null_keys': int(features['key_null'].sum()),
+            'meaningful_keys': int(features['key_meaningful'].sum()),
+            'title_case_keys': int(features['key_title_case'].sum()),
+            'avg_key_length': float(features['key_length'].mean()) if rows else 0,
+            'duplicate_key_rows': int(features['key_duplicate'].sum()),
+            'null_values': int(features['value_null'].sum()),
+            'empty_values': int(features['value_empty'].sum()),
+            'unique_values': int(self._values.nunique()),
+            'avg_value_length': float(features['value_length'].mean()) if rows else 0,
+            'comments': int(features['comment_present'].sum()),
+        }
+
+    def percent(self, count):
+        """count as a percentage of rows (0 for an empty frame)"""
+        rows = self.summary['rows']
+        return (count / rows * 100) if rows else 0
+
+    def output_text(self):
+        """All Value and Comments text, as used by the completeness checks"""
+        return (self._values + " " + self.df['Comments'].map(str) + " ").str.cat()
@@ -0,0 +1,51 @@
+"""
+Single-flight request coalescing.
+Concurrent callers asking for the same key share one execution: the first
+caller runs the function, the others wait on its future and receive the
+same result (or the same exception).
+"""
+
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) unless a call for key is already in flight,
+        in which case wait for that call instead. Results are shared between
+        callers, so treat them as read-only.
+        """
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self.calls[key] = future
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.calls[key]
+
+    def in_flight(self):
+        """Number of distinct keys currently being computed"""
+        with self.lock:
+            return len(self.calls)
@@ -4,26 +4,25 @@ Evaluates extraction quality based on PDF content only
 """
 
 import pandas as pd
-import PyPDF2
 import re
 from collections import Counter
+from pdf_backends import TextExtractor, DEFAULT_BACKENDS
+from scoring import RowScores, REPORT_KEY_PATTERNS
 
 class StandaloneEvaluator:
-    def __init__(self, generated_excel, input_pdf):
+    def __init__(self, generated_excel, input_pdf, pdf_backends=DEFAULT_BACKENDS):
         self.generated_excel = generated_excel
         self.input_pdf = input_pdf
         self.pdf_text = ""
         self.df = None
+        self.scores = None
+        self.text_extractor = TextExtractor(pdf_backends)
         
     def extract_pdf_text(self):
         """Extract all text from PDF"""
         print("📄 Reading input PDF...")
-        text = ""
         try:
-            with open(self.input_pdf, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
+            text = self.text_extractor.extract_text(self.input_pdf)
             self.pdf_text = text
             print(f"   ✓ Extracted {len(text)} characters from PDF")
             return text
@@ -37,6 +36,7 @@ class StandaloneEvaluator:
         try:
             df = pd.read_excel(self.generated_excel, sheet_name='Output')
             self.df = df
+            self.scores = RowScores(df, REPORT_KEY_PATTERNS)
             print(f"   ✓ Loaded {len(df)} rows")
             return df
         except Exception as e:
@@ -69,8 +69,8 @@ class StandaloneEvaluator:
             print("❌ Row numbering incorrect")
         
         # Check for nulls
-        null_keys = self.df['Key'].isna().sum()
-        null_values = self.df['Value'].isna().sum()
+        null_keys = self.scores.summary['null_keys']
+        null_values = self.scores.summary['null_values']
         
         if null_keys == 0:
             print("✅ No null keys")
@@ -97,10 +97,7 @@ class StandaloneEvaluator:
         max_score = 30
         
         # Extract all output text
-        output_text = ""
-        for _, row in self.df.iterrows():
-            output_text += str(row['Value']) + " "
-            output_text += str(row['Comments']) + " "
+        output_text = self.scores.output_text()
         
         # Find all numbers in PDF (dates, ages, salaries, scores, etc.)
         pdf_numbers = re.findall(r'\b\d+[\d\.,]*\b', self.pdf_text)
@@ -168,24 +165,13 @@ class StandaloneEvaluator:
         score = 0
         max_score = 25
         
-        keys = self.df['Key'].tolist()
+        summary = self.scores.summary
+        total_keys = summary['rows']
         
-        # Check for meaningful patterns
-        good_patterns = [
-            'name', 'date', 'birth', 'age', 'salary', 'organization',
-            'designation', 'role', 'education', 'degree', 'college',
-            'certification', 'skill', 'proficiency', 'school', 'year',
-            'joining', 'current', 'previous', 'score', 'grade'
-        ]
-        
-        meaningful_count = 0
-        for key in keys:
-            key_lower = str(key).lower()
-            if any(pattern in key_lower for pattern in good_patterns):
-                meaningful_count += 1
-        
-        meaningful_percent = (meaningful_count / len(keys) * 100) if keys else 0
-        print(f"📊 Meaningful Keys: {meaningful_count}/{len(keys)} ({meaningful_percent:.1f}%)")
+        # Check for meaningful patterns (REPORT_KEY_PATTERNS)
+        meaningful_count = summary['meaningful_keys']
+        meaningful_percent = self.scores.percent(meaningful_count)
+        print(f"📊 Meaningful Keys: {meaningful_count}/{total_keys} ({meaningful_percent:.1f}%)")
         
         if meaningful_percent >= 80:
             score += 10
@@ -198,19 +184,19 @@ class StandaloneEvaluator:
             print("   ⚠️  Keys could be more descriptive")
         
         # Check for duplicates
-        duplicates = self.df[self.df.duplicated(subset=['Key'], keep=False)]
-        if len(duplicates) == 0:
+        duplicates = summary['duplicate_key_rows']
+        if duplicates == 0:
             print("✅ No duplicate keys")
             score += 5
         else:
-            print(f"❌ Found {len(duplicates)} duplicate keys")
+            print(f"❌ Found {duplicates} duplicate keys")
             score += 2
         
         # Check key formatting (Title Case)
-        properly_formatted = sum(1 for k in keys if str(k) and str(k)[0].isupper())
-        format_percent = (properly_formatted / len(keys) * 100) if keys else 0
+        properly_formatted = summary['title_case_keys']
+        format_percent = self.scores.percent(properly_formatted)
         
-        print(f"📊 Proper Formatting: {properly_formatted}/{len(keys)} ({format_percent:.1f}%)")
+        print(f"📊 Proper Formatting: {properly_formatted}/{total_keys} ({format_percent:.1f}%)")
         
         if format_percent >= 90:
             score += 5
@@ -223,7 +209,7 @@ class StandaloneEvaluator:
             print("   ⚠️  Inconsistent formatting")
         
         # Check average key length (should be descriptive but not too long)
-        avg_key_length = sum(len(str(k)) for k in keys) / len(keys) if keys else 0
+        avg_key_length = summary['avg_key_length']
         print(f"\n📊 Average Key Length: {avg_key_length:.1f} characters")
         
         if 15 <= avg_key_length <= 40:
@@ -248,10 +234,11 @@ class StandaloneEvaluator:
         score = 0
         max_score = 15
         
-        values = self.df['Value'].tolist()
+        summary = self.scores.summary
+        total_values = summary['rows']
         
         # Check for empty values
-        empty_values = sum(1 for v in values if pd.isna(v) or str(v).strip() == '')
+        empty_values = summary['empty_values']
         if empty_values == 0:
             print("✅ No empty values")
             score += 5
@@ -260,10 +247,10 @@ class StandaloneEvaluator:
             score += 2
         
         # Check value diversity (not all same)
-        unique_values = len(set(str(v) for v in values))
-        diversity_percent = (unique_values / len(values) * 100) if values else 0
+        unique_values = summary['unique_values']
+        diversity_percent = self.scores.percent(unique_values)
         
-        print(f"📊 Value Diversity: {unique_values}/{len(values)} unique ({diversity_percent:.1f}%)")
+        print(f"📊 Value Diversity: {unique_values}/{total_values} unique ({diversity_percent:.1f}%)")
         
         if diversity_percent >= 85:
             score += 5
@@ -276,7 +263,7 @@ class StandaloneEvaluator:
             print("   ⚠️  Low diversity (possible duplicates)")
         
         # Check average value length
-        avg_value_length = sum(len(str(v)) for v in values) / len(values) if values else 0
+        avg_value_length = summary['avg_value_length']
         print(f"\n📊 Average Value Length: {avg_value_length:.1f} characters")
         
         if avg_value_length >= 5:
@@ -299,8 +286,8 @@ class StandaloneEvaluator:
         max_score = 10
         
         # Count non-empty comments
-        non_empty = self.df[self.df['Comments'].notna() & (self.df['Comments'] != '')].shape[0]
-        comment_percent = (non_empty / len(self.df) * 100) if len(self.df) > 0 else 0
+        non_empty = self.scores.summary['comments']
+        comment_percent = self.scores.percent(non_empty)
         
         print(f"📊 Comments Usage: {non_empty}/{len(self.df)} rows ({comment_percent:.1f}%)")
         
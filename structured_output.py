@@ -0,0 +1,171 @@
+"""
+Schema-constrained JSON output with targeted repair.
+Rows are requested in Groq's JSON mode, validated one by one against the
+{key, value, comments} schema, and when a response is truncated or
+malformed only the missing tail is re-requested with a continuation
+prompt instead of resending the whole extraction.
+"""
+
+import json
+from rows import Row
+
+ROWS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "rows": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "key": {"type": "string"},
+                    "value": {"type": "string"},
+                    "comments": {"type": "string"},
+                },
+                "required": ["key", "value", "comments"],
+                "additionalProperties": False,
+            },
+        }
+    },
+    "required": ["rows"],
+    "additionalProperties": False,
+}
+
+JSON_OBJECT_INSTRUCTION = """
+
+OUTPUT FORMAT: respond with a single JSON object of the form {"rows": [...]}, where the array holds the key/value/comments objects described above."""
+
+CONTINUATION_PROMPT = """You are continuing a data extraction that was cut off. The text below was being converted into key-value pairs with optional comments.
+
+{already} rows have already been extracted. The last ones were:
+{tail}
+
+Continue the extraction from exactly where it stopped. Do NOT repeat rows that were already extracted. Preserve original wording and do not summarize.
+
+TEXT TO EXTRACT:
+{pdf_text}
+
+Respond with a single JSON object {{"rows": [...]}} containing ONLY the remaining rows, each {{"key": ..., "value": ..., "comments": ...}}. If nothing remains, respond with {{"rows": []}}."""
+
+_SCALARS = (str, int, float, bool)
+
+
+def validate_row(obj):
+    """Row for obj, or None if obj doesn't match the schema"""
+    if not isinstance(obj, dict):
+        return None
+    key = obj.get("key")
+    value = obj.get("value")
+    comments = obj.get("comments", "")
+    if not isinstance(key, str) or not key.strip():
+        return None
+    if value is None:
+        value = ""
+    if comments is None:
+        comments = ""
+    if not isinstance(value, _SCALARS) or not isinstance(comments, _SCALARS):
+        return None
+    return Row(key, value, comments)
+
+
+def salvage_rows(text):
+    """
+    Parse rows one at a time from a possibly truncated response.
+    Returns (rows, complete): rows is the longest valid prefix and complete
+    is True only if the closing bracket of the array was reached.
+    """
+    decoder = json.JSONDecoder()
+    start = text.find("[")
+    if start == -1:
+        return [], False
+
+    rows = []
+    pos = start + 1
+    while True:
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(text):
+            return rows, False
+        if text[pos] == "]":
+            return rows, True
+        try:
+            obj, pos = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            return rows, False
+        row = validate_row(obj)
+        if row is None:
+            return rows, False
+        rows.append(row)
+
+
+def _failed_generation(error):
+    """Partial output Groq attaches when JSON mode validation fails"""
+    body = getattr(error, "body", None)
+    if isinstance(body, dict):
+        details = body.get("error", body)
+        if isinstance(details, dict):
+            return details.get("failed_generation")
+    return None
+
+
+class StructuredOutputClient:
+    def __init__(self, client, mode="json_object", max_tokens=8000, max_continuations=3):
+        """
+        mode is "json_object" (JSON mode) or "json_schema" (strict schema,
+        for models that support it).
+        """
+        self.client = client
+        self.mode = mode
+        self.max_tokens = max_tokens
+        self.max_continuations = max_continuations
+        self.continuations = 0
+
+    def _response_format(self):
+        if self.mode == "json_schema":
+            return {"type": "json_schema",
+                    "json_schema": {"name": "extracted_rows", "schema": ROWS_SCHEMA}}
+        return {"type": "json_object"}
+
+    def _request(self, model, prompt):
+        """One completion; returns (rows, complete)"""
+        try:
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                response_format=self._response_format(),
+                max_tokens=self.max_tokens,
+                temperature=0.1
+            )
+        except Exception as e:
+            partial = _failed_generation(e)
+            if partial is None:
+                raise
+            return salvage_rows(partial)
+
+        choice = response.choices[0]
+        rows, complete = salvage_rows(choice.message.content or "")
+        if getattr(choice, "finish_reason", None) == "length":
+            complete = False
+        return rows, complete
+
+    def extract_rows(self, model, prompt, pdf_text):
+        """
+        Request rows for prompt; if the response is cut short, ask only for
+        the remaining rows of pdf_text until complete or out of retries.
+        """
+        rows, complete = self._request(model, prompt + JSON_OBJECT_INSTRUCTION)
+
+        rounds = 0
+        while not complete and rounds < self.max_continuations:
+            rounds += 1
+            self.continuations += 1
+            tail = "\n".join(json.dumps(row.as_dict()) for row in rows[-5:]) or "(none)"
+            continuation = CONTINUATION_PROMPT.format(
+                already=len(rows), tail=tail, pdf_text=pdf_text)
+            more, complete = self._request(model, continuation)
+            if not more and not complete:
+                break
+            rows.extend(more)
+
+        if not rows and not complete:
+            raise ValueError("Model returned no valid rows after repair attempts")
+        return rows
@@ -0,0 +1,249 @@
+"""
+Layout-aware local table extraction.
+Word positions from the PDF layer are grouped into lines, lines into
+gap-separated segments, and runs of consecutive lines whose segments
+line up in the same columns become tables. Tables go straight to their
+own worksheets with exact cell alignment, and their lines are dropped
+from the text sent to the LLM - the rest of the text backend's output is
+kept as it was.
+
+Uses PyMuPDF word boxes when installed, else pdfminer.six character boxes.
+"""
+
+import io
+import statistics
+from collections import Counter
+import pandas as pd
+from pdf_backends import read_pdf_bytes
+
+try:
+    try:
+        import pymupdf
+    except ImportError:
+        import fitz as pymupdf
+except ImportError:
+    pymupdf = None
+
+try:
+    from pdfminer.high_level import extract_pages as pdfminer_pages
+    from pdfminer.layout import LTChar, LTTextContainer, LTTextLine
+except ImportError:
+    pdfminer_pages = None
+
+TABLES_AVAILABLE = pymupdf is not None or pdfminer_pages is not None
+
+
+class Table:
+    def __init__(self, page_num, rows):
+        self.page_num = page_num
+        self.rows = rows
+
+    def to_frame(self):
+        """Cells as a DataFrame; the first row is the header when it looks like one"""
+        header = self.rows[0]
+        if all(header) and len(set(header)) == len(header):
+            return pd.DataFrame(self.rows[1:], columns=header)
+        columns = [f"Column {n}" for n in range(1, len(header) + 1)]
+        return pd.DataFrame(self.rows, columns=columns)
+
+
+def table_sheet_names(tables):
+    """Worksheet names for tables, e.g. 'Table 1 (p2)'"""
+    return [f"Table {n} (p{table.page_num + 1})" for n, table in enumerate(tables, start=1)]
+
+
+def table_sheets(tables):
+    """(sheet name, DataFrame) for every table"""
+    return [(name, table.to_frame()) for table, name in zip(tables, table_sheet_names(tables))]
+
+
+def write_tables(writer, tables):
+    """Extracted tables as extra worksheets of an open ExcelWriter"""
+    for name, frame in table_sheets(tables):
+        frame.to_excel(writer, sheet_name=name, index=False)
+
+
+def remove_table_lines(text, tables):
+    """
+    text without the lines that belong to tables: a line goes when every
+    word on it is a still-unclaimed table word. Lines that mix table
+    words with other text are kept, so nothing but table text is lost.
+    """
+    remaining = Counter(word for table in tables for row in table.rows
+                        for cell in row for word in cell.split())
+    kept = []
+    for line in text.splitlines(keepends=True):
+        words = Counter(line.split())
+        if words and all(remaining[word] >= count for word, count in words.items()):
+            remaining -= words
+        else:
+            kept.append(line)
+    return "".join(kept)
+
+
+def _pymupdf_words(data):
+    doc = pymupdf.open(stream=data, filetype="pdf")
+    for page in doc:
+        yield [(x0, top, x1, bottom, text) for x0, top, x1, bottom, text, *_ in page.get_text("words")]
+
+
+def _pdfminer_words(data):
+    """Words rebuilt from pdfminer character boxes (y flipped to top-down)"""
+    for layout in pdfminer_pages(io.BytesIO(data)):
+        height = layout.height
+        words = []
+        for element in layout:
+            if not isinstance(element, LTTextContainer):
+                continue
+            for line in element:
+                if not isinstance(line, LTTextLine):
+                    continue
+                word = []
+                for char in list(line) + [None]:
+                    if isinstance(char, LTChar) and char.get_text().strip():
+                        word.append(char)
+                        continue
+                    if word:
+                        words.append((word[0].x0, height - max(c.y1 for c in word), word[-1].x1,
+                                      height - min(c.y0 for c in word),
+                                      "".join(c.get_text() for c in word)))
+                        word = []
+        yield words
+
+
+class TableExtractor:
+    def __init__(self, min_rows=3, min_columns=2, column_gap=1.0, max_cell_chars=60):
+        """
+        column_gap: horizontal gap, in multiples of the line height, that
+        separates two cells (word spacing is ~0.3). Tables need min_rows
+        aligned lines of min_columns+ cells; long "cells" (two-column prose)
+        are rejected via max_cell_chars.
+        """
+        if not TABLES_AVAILABLE:
+            raise ImportError("Table extraction needs PyMuPDF or pdfminer.six: pip install pymupdf")
+        self.min_rows = min_rows
+        self.min_columns = min_columns
+        self.column_gap = column_gap
+        self.max_cell_chars = max_cell_chars
+
+    def _words(self, data):
+        return _pymupdf_words(data) if pymupdf is not None else _pdfminer_words(data)
+
+    @staticmethod
+    def _lines(words):
+        """Words grouped into top-to-bottom lines of left-to-right words"""
+        lines = []
+        for word in sorted(words, key=lambda w: ((w[1] + w[3]) / 2, w[0])):
+            center = (word[1] + word[3]) / 2
+            if lines:
+                last = lines[-1]
+                if abs(center - last["center"]) < (last["bottom"] - last["top"]) / 2:
+                    last["words"].append(word)
+                    last["top"] = min(last["top"], word[1])
+                    last["bottom"] = max(last["bottom"], word[3])
+                    continue
+            lines.append({"center": center, "top": word[1], "bottom": word[3], "words": [word]})
+        for line in lines:
+            line["words"].sort(key=lambda w: w[0])
+        return lines
+
+    def _segments(self, line):
+        """(x0, x1, text) runs of a line split at wide gaps"""
+        gap = self.column_gap * (line["bottom"] - line["top"])
+        segments = []
+        for x0, _, x1, _, text in line["words"]:
+            if segments and x0 - segments[-1][1] <= gap:
+                prev = segments[-1]
+                segments[-1] = (prev[0], x1, prev[2] + " " + text)
+            else:
+                segments.append((x0, x1, text))
+        return segments
+
+    @staticmethod
+    def _assign(columns, segments):
+        """Column index for each segment, or None if the row doesn't fit the columns"""
+        assigned = []
+        for x0, x1, _ in segments:
+            hits = [i for i, (c0, c1) in enumerate(columns) if x0 <= c1 and x1 >= c0]
+            if len(hits) > 1:
+                return None
+            assigned.append(hits[0] if hits else None)
+        used = [i for i in assigned if i is not None]
+        if len(used) != len(set(used)) or len(used) < min(2, len(segments)):
+            return None
+        return assigned
+
+    def _find_tables(self, lines):
+        """[(first_line, last_line, rows)] for runs of column-aligned lines"""
+        split = [self._segments(line) for line in lines]
+        tables = []
+        start = 0
+        while start < len(lines):
+            if len(split[start]) < self.min_columns:
+                start += 1
+                continue
+            columns = [(x0, x1) for x0, x1, _ in split[start]]
+            members = [start]
+            end = start + 1
+            while end < len(lines) and len(split[end]) >= self.min_columns:
+                spacing = lines[end]["top"] - lines[end - 1]["bottom"]
+                if spacing > 2 * (lines[end]["bottom"] - lines[end]["top"]):
+                    break
+                assigned = self._assign(columns, split[end])
+                if assigned is None:
+                    break
+                for (x0, x1, _), column in zip(split[end], assigned):
+                    if column is None:
+                        columns.append((x0, x1))
+                    else:
+                        c0, c1 = columns[column]
+                        columns[column] = (min(c0, x0), max(c1, x1))
+                members.append(end)
+                end += 1
+
+            cells = [text for index in members for _, _, text in split[index]]
+            if (len(members) >= self.min_rows
+                    and statistics.median(len(cell) for cell in cells) <= self.max_cell_chars):
+                order = sorted(range(len(columns)), key=lambda i: columns[i][0])
+                rows = []
+                for index in members:
+                    row = [""] * len(columns)
+                    for x0, x1, text in split[index]:
+                        hit = next(i for i, (c0, c1) in enumerate(columns) if x0 <= c1 and x1 >= c0)
+                        row[hit] = text
+                    rows.append([row[i] for i in order])
+                tables.append((start, end - 1, rows))
+                start = end
+            else:
+                start += 1
+        return tables
+
+    def extract(self, source, pages_text=None):
+        """
+        Returns (tables, page_texts): the Tables found, and for every page
+        that had one, its remaining text with the table lines removed.
+        With pages_text (the text backend's per-page output) only the table
+        lines are taken out of it; without, the rest of the page is rebuilt
+        from the word positions, which loses the backend's own layout.
+        """
+        data = read_pdf_bytes(source)
+        tables = []
+        page_texts = {}
+        for page_num, words in enumerate(self._words(data)):
+            lines = self._lines(words)
+            found = self._find_tables(lines)
+            if not found:
+                continue
+            page_tables = [Table(page_num, rows) for _, _, rows in found]
+            tables.extend(page_tables)
+            if pages_text is not None and page_num < len(pages_text):
+                page_texts[page_num] = remove_table_lines(pages_text[page_num], page_tables)
+                continue
+            in_table = set()
+            for first, last, _ in found:
+                in_table.update(range(first, last + 1))
+            page_texts[page_num] = "".join(
+                " ".join(word[4] for word in line["words"]) + "\n"
+                for index, line in enumerate(lines) if index not in in_table
+            )
+        return tables, page_texts
@@ -0,0 +1,126 @@
+"""
+Tiered Extraction - try a small, fast model first and escalate only the
+chunks whose DataEvaluator score falls below a threshold
+"""
+
+import threading
+import time
+from data_evaluator import DataEvaluator
+from rows import rows_to_frame
+
+SMALL_MODEL = "llama-3.1-8b-instant"
+LARGE_MODEL = "llama-3.3-70b-versatile"
+DEFAULT_TIERS = (SMALL_MODEL, LARGE_MODEL)
+DEFAULT_THRESHOLD = 75.0
+DEFAULT_CHUNK_CHARS = 12000
+
+
+def split_into_chunks(text, max_chars=DEFAULT_CHUNK_CHARS):
+    """Split text on line boundaries into chunks of at most max_chars"""
+    chunks = []
+    current = []
+    size = 0
+    for line in text.splitlines(keepends=True):
+        if current and size + len(line) > max_chars:
+            chunks.append("".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line)
+    if current:
+        chunks.append("".join(current))
+    return chunks or [text]
+
+
+class TieredExtractor:
+    def __init__(self, extract_fn, models=DEFAULT_TIERS, threshold=DEFAULT_THRESHOLD,
+                 chunk_chars=DEFAULT_CHUNK_CHARS):
+        """
+        extract_fn(text, model=...) must return a list of rows.Row,
+        e.g. extract_structured_data.
+        Models are tried in order; the last one is always accepted.
+        """
+        self.extract_fn = extract_fn
+        self.models = list(models)
+        self.threshold = threshold
+        self.chunk_chars = chunk_chars
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Clear per-tier counters"""
+        self.chunks = 0
+        self.stats = {
+            model: {"calls": 0, "seconds": 0.0, "escalated": 0, "failed": 0}
+            for model in self.models
+        }
+
+    def score(self, rows, chunk_text):
+        """Score one chunk's rows with the DataEvaluator overall score"""
+        if not rows:
+            return 0.0
+        return DataEvaluator(rows_to_frame(rows), chunk_text).get_overall_score()
+
+    def extract_chunk(self, chunk_text):
+        """Run a chunk through the tiers until one scores above threshold"""
+        with self.lock:
+            self.chunks += 1
+        for tier, model in enumerate(self.models):
+            is_last = tier == len(self.models) - 1
+            stats = self.stats[model]
+
+            start = time.perf_counter()
+            failed = False
+            try:
+                rows = self.extract_fn(chunk_text, model=model)
+            except Exception:
+                failed = True
+                if is_last:
+                    raise
+                rows = None
+            finally:
+                # Chunks may be extracted concurrently
+                with self.lock:
+                    stats["calls"] += 1
+                    stats["seconds"] += time.perf_counter() - start
+                    stats["failed"] += failed
+
+            if is_last:
+                return rows
+            if rows is not None and self.score(rows, chunk_text) >= self.threshold:
+                return rows
+            with self.lock:
+                stats["escalated"] += 1
+
+    def extract(self, text, chunks=None):
+        """Extract all chunks of text, escalating weak chunks (chunks: pre-split text)"""
+        rows = []
+        if chunks is None:
+            chunks = [chunk for chunk in split_into_chunks(text, self.chunk_chars) if chunk.strip()]
+        for chunk in chunks or [text]:
+            rows.extend(self.extract_chunk(chunk))
+        return rows
+
+    def report(self):
+        """Per-tier latency and escalation rates"""
+        report = []
+        for model in self.models:
+            stats = self.stats[model]
+            calls = stats["calls"]
+            report.append({
+                "Model": model,
+                "Calls": calls,
+                "Total Seconds": round(stats["seconds"], 2),
+                "Avg Seconds": round(stats["seconds"] / calls, 2) if calls else 0.0,
+                "Escalated": stats["escalated"],
+                "Escalation Rate": round(stats["escalated"] / calls * 100, 1) if calls else 0.0,
+                "Failed": stats["failed"],
+            })
+        return report
+
+    def print_report(self):
+        """Print tier statistics for CLI runs"""
+        print(f"\n⚡ Tiered extraction over {self.chunks} chunk(s):")
+        for entry in self.report():
+            print(f"   • {entry['Model']}: {entry['Calls']} calls, "
+                  f"avg {entry['Avg Seconds']}s, "
+                  f"escalated {entry['Escalated']} ({entry['Escalation Rate']}%)")